@@ -3,7 +3,9 @@
 
 from transaction import Transaction
 from collections import namedtuple, defaultdict
+from fenwick     import MonthTree
 import valid
+import changes
 
 Budget = namedtuple("Budget", "goal reached ts_amt")
 # goal:        amount of money planned to be saved/spent 
@@ -12,16 +14,16 @@ Budget = namedtuple("Budget", "goal reached ts_amt")
 
 
 class Account:
-    @staticmethod 
-    def _cond(y,m,t): return t.get_year() == y and t.get_month() == m
-    
-     
     def __init__(self, name: str, kind, ts: [Transaction], budgets):
         self._name      = name 
         self._kind      = kind 
         self._ts        = ts 
         self._budgets   = budgets 
+        self._gen       = 0                     # Incremented by every mutation
+        self._goals_set = set()                 # (y, m) of goals set by set_goal
         
+        self._index()
+        self._index_budgets()
         self._fill_budgets(self._sum_transxs())
         
 
@@ -61,21 +63,103 @@ class Account:
             "Account.__contains__: type of item {} is {}, not Transaction or tuple".format(
             item, type(item))
         if type(item) == Transaction: 
-            return any(item == j for j in self._ts)
+            return self.find(item) is not None
         else:
             return any(item == self._budgets[y][m] for y in self._budgets for m in self._budgets[y]) 
 
     
+    def _index(self) -> None:
+        """Builds the index of (year, month) to the number and signed sum of
+        the Transactions of that month
+        """
+        self._buckets   = dict()                # (y, m) -> [number of Transactions, signed sum]
+        self._filed     = dict()                # id() of Transaction -> (generation, (y, m), signed amount, key)
+        self._keyed     = dict()                # key() of Transaction -> {id(): Transaction} filed under it
+        self._seen      = changes.generation    # Changes before this are reflected in the index
+        for t in self._ts: 
+            self._file(t)
+    
+    
+    def _file(self, t: Transaction) -> (int, int):
+        """Adds Transaction to the bucket of its month. Returns the month
+        """
+        k, v, key = (t.get_year(), t.get_month()), t.get_amount()*t.flow(self._name), t.key()
+        bucket = self._buckets.setdefault(k, [0, 0])
+        bucket[0] += 1
+        bucket[1] += v
+        self._filed[id(t)] = (t.get_gen(), k, v, key)
+        self._keyed.setdefault(key, dict())[id(t)] = t
+        return k
+    
+    
+    def _unfile(self, t: Transaction) -> (int, int):
+        """Removes Transaction from the bucket it was filed in, which is not 
+        its month if it was edited since. Returns that month
+        """
+        _, k, v, key = self._filed.pop(id(t))
+        held = self._keyed[key]
+        del held[id(t)]
+        if len(held) == 0: 
+            del self._keyed[key]
+        bucket = self._buckets[k]
+        bucket[0] -= 1
+        bucket[1] -= v
+        if bucket[0] == 0: 
+            del self._buckets[k]
+        return k
+    
+    
+    def _refresh(self) -> None:
+        """Refiles the Transactions edited since the index was last brought up 
+        to date. Editing one of its Transactions counts as a change to the 
+        Account, so its generation is incremented
+        """
+        if self._seen == changes.generation: 
+            return
+        if self._seen >= changes.horizon:                                       # Every change since is recorded
+            edited = [t for t in changes.dirty_since(self._seen) if id(t) in self._filed]
+        else: 
+            edited = self._ts
+        self._seen = changes.generation
+        for t in edited: 
+            if self._filed[id(t)][0] != t.get_gen(): 
+                self._unfile(t)
+                self._file(t)
+                self._gen += 1
+    
+    
+    def _index_budgets(self) -> None:
+        """Builds the Fenwick trees of each Budget attribute by month
+        """
+        self._trees = {f: MonthTree() for f in Budget._fields}
+        for y in self._budgets: 
+            for m in self._budgets[y]: 
+                for f, v in zip(Budget._fields, self._budgets[y][m]): 
+                    self._trees[f].set(y, m, v)
+    
+    
+    def _set_budget(self, y, m, b: Budget) -> None:
+        """Replaces the Budget of a year and month, keeping the trees in step
+        """
+        self._budgets.setdefault(y, dict())[m] = b
+        for f, v in zip(Budget._fields, b): 
+            self._trees[f].set(y, m, v)
+    
+    
+    def _count(self, y, m) -> int: 
+        return self._buckets[(y, m)][0] if (y, m) in self._buckets else 0
+    
+    def _total(self, y, m) -> int: 
+        return self._buckets[(y, m)][1] if (y, m) in self._buckets else 0
+    
+    
     def _sum_transxs(self):
         """Returns the sum of sorted transactions 
         """
+        self._refresh()
         d = defaultdict(dict)
-        for t in self._ts: 
-            y, m = t.get_year(), t.get_month()
-            if m not in d[y]: 
-                d[y][m] = (t.get_amount()*t.flow(self._name))
-            else: 
-                d[y][m] += (t.get_amount()*t.flow(self._name))
+        for (y, m), (_, v) in sorted(self._buckets.items()): 
+            d[y][m] = v
         return d 
         
         
@@ -84,73 +168,121 @@ class Account:
         """
         for y in d: 
             for m in d[y]:  
-                if y not in self._budgets:
-                    self._budgets[y] = dict()
-                if m not in self._budgets[y]: 
-                    self._budgets[y][m] = Budget(
-                        d[y][m], d[y][m], 
-                        len([i for i in self._ts if Account._cond(y,m,i)]))
+                if m not in self._budgets.get(y, dict()): 
+                    self._set_budget(y, m, Budget(d[y][m], d[y][m], self._count(y,m)))
                 
     
+    def _goal(self, y, m, b: Budget, v) -> int:
+        """Returns goal of Budget b of a month once reached is v. A goal never
+        set, filled in as the month's total, follows the total; a goal set is
+        kept
+        """
+        if (y, m) not in self._goals_set and b.goal == b.reached:
+            return v
+        return b.goal
+
+
     def _revise_budget(self, y, m):
-        """Changes the budget of a year and month
+        """Changes the budget of a year and month. A goal already set is kept
         """
-        ts = [i.get_amount()*i.flow(self._name) for i in self._ts if Account._cond(y,m,i)]
-        self._budgets[y][m] = Budget(
-            sum(ts), self._budgets[y][m].reached, len(ts))
+        v, n = self._total(y,m), self._count(y,m)
+        if m not in self._budgets.get(y, dict()):                             # First Transaction of month
+            self._set_budget(y, m, Budget(v, v, n))
+        else:
+            b = self._budgets[y][m]
+            self._set_budget(y, m, Budget(self._goal(y, m, b, v), v, n))
 
 
     def add(self, t):
         assert type(t) == Transaction, \
             "account.Account.add_t: {} is not type Transaction".format(type(t))
         self._ts.append(t)
+        self._file(t)
         self._revise_budget(t.get_year(), t.get_month())
+        self._touch()
     
     
     def update_all_reached(self):
-        """Updates all reached attributes
+        """Updates all reached attributes and Transaction counts, after moving 
+        Transactions edited since the last update to the buckets of their new 
+        months
         """
+        self._refresh()
+        changed = False
+        for y, m in self._buckets: 
+            if m not in self._budgets.get(y, dict()):                           # Edited into a new month
+                self._revise_budget(y, m)
+                changed = True
         for y in self._budgets:
             for m in self._budgets[y]:
-                self.set_reached(
-                    y, m, sum(t.get_amount() for t in self._ts if Account._cond(y,m,t) ))
+                b = self._budgets[y][m]
+                v, n = self._total(y,m), self._count(y,m)
+                if (v, n) != (b.reached, b.ts_amt):
+                    self._set_budget(y, m, Budget(self._goal(y, m, b, v), v, n))
+                    changed = True
+        if changed: 
+            self._touch()
     
     
     def remove_empty_budgets(self):
         """Removes all Account Budget values that do not correspond 
         to any Transactions  
         """
+        self._refresh()
         _budgets_without_empties = defaultdict(dict) 
         for y in self._budgets: 
             for m in self._budgets[y]:
-                _ts_amt = [t for t in self._ts if Account._cond(y,m,t)]
+                _ts_amt = self._count(y,m)
                 if _ts_amt != 0:
                     _budgets_without_empties[y][m] = Budget(
                         self.get_goal(y,m), self.get_reached(y,m), _ts_amt)
-        self.set_budgets(_budgets_without_empties) 
+        if _budgets_without_empties != self._budgets:
+            self.set_budgets(dict(_budgets_without_empties)) 
                      
     
     
+    def _touch(self) -> None:
+        """Records that the Account was mutated
+        """
+        self._gen += 1
+        changes.mark(self)
+    
+    
     # Setters 
     def set_name(self, new_name: str):
+        """Renames Account, and its Transactions' debit and credit account
+        names with it, so each keeps the sign it was filed with
+        """
         valid.name(new_name)
+        for t in self._ts: 
+            if t.get_dr_account() == self._name: 
+                t.set_dr_account(new_name)
+            if t.get_cr_account() == self._name: 
+                t.set_cr_account(new_name)
         self._name = new_name 
+        self._touch()
         
     def set_kind(self, new_kind: int):
         valid.kind(new_kind)
         self._kind = new_kind
+        self._touch()
         
     def set_budgets(self, new_budgets: dict):
         valid.budgets(new_budgets)
         self._budgets = new_budgets
+        self._index_budgets()
+        self._touch()
     
     def set_reached(self, y: int, m: int, v: float):
         valid.amount(v)
-        self._budgets[y][m] = Budget(self.get_goal(y,m), v, self.get_ts_amt(y,m))
+        self._set_budget(y, m, Budget(self.get_goal(y,m), v, self.get_ts_amt(y,m)))
+        self._touch()
     
     def set_goal(self, y: int, m: int, v: float):
         valid.amount(v)
-        self._budgets[y][m] = Budget(v, self.get_reached(y,m), self.get_ts_amt(y,m))
+        self._goals_set.add((y, m))
+        self._set_budget(y, m, Budget(v, self.get_reached(y,m), self.get_ts_amt(y,m)))
+        self._touch()
         
     
     # Analysis of Account
@@ -174,6 +306,15 @@ class Account:
         of budget
         '''
         return (self.get_goal(y,m) - self.get_reached(y,m) / self.get_goal(y,m))
+    
+    
+    def range_total(self, attribute: str, start: (int, int), end: (int, int)) -> float: 
+        '''Returns sum of a Budget attribute ("goal", "reached" or "ts_amt") over 
+        the months from start to end inclusive
+        '''
+        assert attribute in self._trees, \
+            "account.range_total: {} is not an attribute of Budget".format(attribute)
+        return self._trees[attribute].total(start, end)
 
     
     # Getters     
@@ -181,6 +322,10 @@ class Account:
     
     def get_kind(self): return self._kind
     
+    def get_gen(self): 
+        self._refresh()
+        return self._gen
+    
     def get_budgets(self, year=None, month=None):
         if year == month == None: 
             return self._budgets 
@@ -238,26 +383,40 @@ class Account:
             assert self._kind == i.get_kind(), \
             err_name+"kind of right should be {} but is {}".format(
                 self._kind, right.get_name())
-        unique_ts = self._ts
-        iterated = self._ts
+        unique_ts = list(self._ts)
+        iterated = set(self._ts)
         for acct in right:  
             for t in acct.get_ts():
                 if t not in iterated: 
                     unique_ts.append(t)
+                    iterated.add(t)
         return Account(self._name, self._kind, unique_ts, {})            
 
 
+    def find(self, t: Transaction) -> Transaction:
+        """Returns the Transaction of the Account equal to t: t itself if the
+        Account holds it, or else a copy of it. Returns None if there is none
+        """
+        self._refresh()
+        held = self._keyed.get(t.key())
+        if held is None: 
+            return None
+        return t if id(t) in held else next(iter(held.values()))
+
+
     def remove(self, t: Transaction):
         """Removes transaction from Transaction object collection in 
         Account. Updates from removal
         """
-        assert t in self._ts, \
+        t = self.find(t)
+        assert t is not None, \
         "account.Account.remove: {} not in self._ts".format(t)
-        y,m = t.get_year(), t.get_month()
-        self._ts.remove(t)
-        self._budgets[y][m] = Budget(
-            self.get_goal(y,m), 
-            self.get_reached(y,m) - (t.get_amount()), self.get_ts_amt(y,m) - 1)
+        i = next(i for i, held in enumerate(self._ts) if held is t)             # By identity, not equality
+        v = self._filed[id(t)][2]
+        y,m = self._unfile(self._ts.pop(i))
+        b = Budget(self.get_goal(y,m), self.get_reached(y,m), self.get_ts_amt(y,m))
+        self._set_budget(y, m, Budget(self._goal(y, m, b, b.reached - v), b.reached - v, b.ts_amt - 1))
+        self._touch()
 
 
 # Testing 
@@ -333,3 +492,71 @@ if __name__ == "__main__":
     print(a1.sum_remain(2015,11)) 
     print(a1.perc_reached(2015,11))
     print(a1.perc_remain(2015,11))
+     
+    # Testing a Transaction edited into another month
+    print()
+    t3.set_month(9)
+    a1.update_all_reached()
+    print(a1.get_budgets())
+    a1.remove_empty_budgets()
+    print(a1.get_budgets())
+    print(a1.range_total("goal", (2015, 0), (2015, 11)), a1.range_total("ts_amt", (2015, 10), (2016, 0)))
+    
+    # Testing a rename, which keeps the reached of every month
+    print()
+    t6 = Transaction(2015, 4, 2, "Checking", "Salary", "Pay", 500)
+    t7 = Transaction(2015, 4, 9, "Rent", "Checking", "May", 300)
+    a5 = Account("Checking", 0, [t6, t7], {})
+    a5.set_name("Current")
+    a5.update_all_reached()
+    print(a5.get_reached(2015, 4), t6.get_dr_account(), t7.get_cr_account())
+    
+    # Benchmark: updating reached after one edit, for Accounts of 10 years of 
+    # Transactions
+    import time
+    
+    def update_all_reached_by_scan(a):
+        """Previous implementation, rescanning every Transaction for every month
+        """
+        for y in a.get_budgets():
+            for m in a.get_budgets(y):
+                v = sum(t.get_amount()*t.flow(a.get_name()) for t in a.get_ts() 
+                        if t.get_year() == y and t.get_month() == m)
+                if v != a.get_reached(y,m):
+                    a.set_reached(y, m, v)
+    
+    ats = [Account("Account {}".format(i), 0, 
+                   [Transaction(2010 + j % 10, j % 12, j % 28, "Account {}".format(i), "Cash", 
+                                "Description", j) for j in range(1000)], {}) for i in range(50)]
+    for a in ats: 
+        a.update_all_reached()
+    ats[0].get_ts()[0].set_month(5)
+    
+    start = time.perf_counter()
+    for a in ats: 
+        update_all_reached_by_scan(a)
+    print("Scan    : {:.3f} s".format(time.perf_counter()-start))
+    
+    ats[0].get_ts()[0].set_month(6)
+    start = time.perf_counter()
+    for a in ats: 
+        a.update_all_reached()
+    print("Buckets : {:.3f} s".format(time.perf_counter()-start))
+
+    # Benchmark: finding and removing equal copies of Transactions, as the
+    # journal and the database do, in an Account of 100,000
+    ts = [Transaction(2000 + j % 20, j % 12, j % 28, "Cash", "Account {}".format(j), "Description", j)
+          for j in range(100000)]
+    a = Account("Cash", 3, list(ts), {})
+    copies = [Transaction(t.get_year(), t.get_month(), t.get_day(), t.get_dr_account(), 
+                          t.get_cr_account(), t.get_description(), t.get_amount()) for t in ts[-100:]]
+    start = time.perf_counter()
+    found = sum(1 for t in copies if t in ts)
+    print("List    : {:.3f} s to find {}".format(time.perf_counter()-start, found))
+    start = time.perf_counter()
+    found = sum(1 for t in copies if t in a)
+    print("Keys    : {:.3f} s to find {}".format(time.perf_counter()-start, found))
+    start = time.perf_counter()
+    for t in copies: 
+        a.remove(t)
+    print("Remove  : {:.3f} s, {} left".format(time.perf_counter()-start, len(a.get_ts())))
@@ -3,12 +3,17 @@
 
 from account                    import Account
 from transaction                import Transaction
+from cube                       import Cube
 from account_graph_rate         import AccountGraphRate
 from account_graph_compare      import AccountGraphCompare
 from account_graph_cash_flow    import AccountGraphCashFlow
+from account_graph_multi        import MultiAccountGraph, fields
 from calendar                   import monthrange
 from datetime                   import date 
 import basecui                  as bc 
+import aggregate
+
+bar_len = 60                                                # space in between brackets of pace bars
 
 menu = """
 BUDGET ANALYSIS MENU
@@ -16,16 +21,22 @@ BUDGET ANALYSIS MENU
     [rsp]    : Rate of spending/saving for an Account
     [css]    : Compare rate of spending to rate of saving  
     [cfs]    : Analyze cash flows
+    [mag]    : View many Accounts on one graph
     [bkd]    : Breakdown totals by Accounts
     [pce]    : Track rate of transactions
     [esc]    : Return to Main Menu
 """
 
-def main(ats: [Account]) -> None:
-    """Main menu for Budget Analysis. Prompts user for a choice
+def main(ats: [Account], store=None, cube: Cube = None) -> None:
+    """Main menu for Budget Analysis. Prompts user for a choice. Totals are 
+    run as queries against the SQLiteStore store if given, and otherwise read 
+    from cube, a Cube over ats kept between visits to the menu
     """
+    if cube is None: 
+        cube = Cube(ats)
     while True:
         if len(ats) == 0: print("No Account exists"); break
+        cube.refresh()
         print(menu)
         try: 
             choice = input("Your choice: ").rstrip()
@@ -35,10 +46,12 @@ def main(ats: [Account]) -> None:
                 _compare_goal_to_reach(ats)
             elif choice == "cfs":
                 _compare_cash_flows(ats)
+            elif choice == "mag":
+                _view_accounts(ats, cube)
             elif choice == "bkd":
-                _breakdown(ats)
+                _breakdown(ats, store, cube)
             elif choice == "pce":
-                _accounts_pace(ats)
+                _accounts_pace(ats, cube)
             elif choice == "esc":
                 break
             else:
@@ -108,7 +121,30 @@ def _compare_cash_flows(ats: [Account]) -> None:
         print("Graph closed")
 
 
-def _breakdown(ats: [Account]) -> None:
+def _view_accounts(ats: [Account], cube: Cube = None) -> None:
+    """Executes choice to view a field of many Accounts on one graph: the 
+    Accounts of a kind overlaid, or every kind stacked
+    """
+    stacked = bc.binary_question("Overlay Accounts of a kind [o] or stack every kind [s]: ", "s", "o")
+    chosen = ats
+    if not stacked:
+        k = _select_kind(ats)
+        chosen = [a for a in ats if a.get_kind() == k]
+    field = _select_field(stacked)
+    tf = aggregate.months(chosen)
+    if len(tf) == 0: 
+        print("No Budget exists"); return
+
+    try: 
+        print("Displaying graph of Accounts")
+        MultiAccountGraph(chosen, tf, field, stacked, cube).view()
+    except Exception as e: 
+        print("    An error has occurred: {}".format(e))
+    else:
+        print("Graph closed")
+
+
+def _breakdown(ats: [Account], store=None, cube: Cube = None) -> None:
     """Executes choice to view the breakdown of transactions 
     of Accounts
     """
@@ -127,9 +163,6 @@ def _breakdown(ats: [Account]) -> None:
             return sorted(set(y for y in a.get_budgets())) + [-1]
         return sorted(set(y for act in a for y in act.get_budgets())) + [-1]
     
-    def _cond1(y,m): return (y0, bc.months_to_int[m0_str[:3]]) \
-        <= (y,m) <= (y1, bc.months_to_int[m1_str[:3]])
-    
     def _um_ats(ats: "generator", y: int) -> [int]:
         """Returns integers represnting unique months of an Account collection
         and breakout integer
@@ -162,9 +195,22 @@ def _breakdown(ats: [Account]) -> None:
         return
     
     k = _select_kind(ats)
-    
+    _breakdown_table(ats, k, (y0, bc.months_to_int[m0_str[:3]]), 
+                     (y1, bc.months_to_int[m1_str[:3]]), store, cube)
+
+
+def _breakdown_table(ats: [Account], k: int, start: (int, int), end: (int, int), 
+                     store=None, cube: Cube = None) -> None:
+    """Prints the breakdown of transactions of the Accounts of kind k over 
+    the months from start to end inclusive
+    """
     k_ats = [a for a in ats if a.get_kind() == k]
-    total = round(sum(t.get_amount() for a in k_ats for t in a.get_ts())/100, 2)
+    if store is not None: 
+        total = round(store.kind_amount(k)/100, 2)
+        amounts = [store.account_amount(a, [start, end]) for a in k_ats]
+    else: 
+        total = round(sum(t.amount for t in aggregate.totals(k_ats, *aggregate.all_time, cube))/100, 2)
+        amounts = [t.amount for t in aggregate.totals(k_ats, start, end, cube)]
     line = "{:>3}. {:30} {:>10.2f} ({:>6.2f}%)"
     
     print("\nBreakdown of " + bc.kind_to_str[k] + " by Account")
@@ -173,19 +219,15 @@ def _breakdown(ats: [Account]) -> None:
     print(line.format(1, "TOTAL", total, 100))
     
     ats.sort(key=lambda x: x.get_name())
-    for n, a in enumerate(k_ats, 2):
-        print(_breakdown_str(n, a, 
-        [(y,m) for y in a.get_budgets() for m in a.get_budgets(y) if _cond1(y,m)],
-        total, line))
+    for n, (a, amount) in enumerate(zip(k_ats, amounts), 2):
+        print(_breakdown_str(n, a, amount, total, line))
         
 
-def _breakdown_str(i: int, a: Account, tf: [(int, int)], net: float, line: str) -> str:
+def _breakdown_str(i: int, a: Account, amount: int, net: float, line: str) -> str:
     """Returns string indicating the breakdown of an Account 
     """
-    tf_amount   = round(
-        sum(t.get_amount() for t in a.get_ts() \
-            if (t.get_year(), t.get_month()) in tf)/100, 2)
-    tf_perc     = round((tf_amount/net)*100, 2)
+    tf_amount   = round(amount/100, 2)
+    tf_perc     = round((tf_amount/net)*100, 2) if net != 0 else 0.0
     return line.format(i, a.get_name(), tf_amount, tf_perc)
 
 
@@ -210,13 +252,37 @@ def _select_kind(ats: [Account]) -> int:
             return -1
     
 
-def _accounts_pace(ats: [Account]) -> None:
+def _select_field(stacked: bool) -> str:
+    """Returns field of the Accounts to graph according to user prompt. 
+    Remain may be negative, so it is not offered to stack
+    """
+    print("\nSelect Field\n"+("="*40))
+    it = [f for f in fields if not (stacked and f == "remain")]
+    while True: 
+        print("Options\n" + ("="*40))
+        for n, v in enumerate(it, 1): 
+            print("{:>3}. {}".format(n, v.capitalize()))
+        try: 
+            choice = int(input("Select by number: ").rstrip())
+            assert 1 <= choice <= len(it)
+        except:
+            print("Choice is invalid. Must be an integer between 1 and {}".format(len(it)))
+        else: 
+            return it[choice-1]
+
+
+def _accounts_pace(ats: [Account], cube: Cube = None, start=aggregate.all_time[0],
+                   end=aggregate.all_time[1]) -> None:
     """Executes choice to view the pacing of reaching goals of 
-    Account budgets
+    Account budgets, over the months from start to end
     """
-    tf = [(y,m) for a in ats for y in a.get_budgets() for m in a.get_budgets(y)]
+    tf = [ym for ym in aggregate.months(ats) if start <= ym <= end]
+    if len(tf) == 0: 
+        print("No Budget exists"); return
     start_year, start_month = tf[0][0], tf[0][1]
     end_year, end_month = tf[-1][0], tf[-1][1]
+    pace_int  = _calculate_pace_placement(tf, bar_len)                          # Same for every Account
+    days_left = _days_remaining(tf)
     
     print("\nShowing Daily Budgeting of Transactions")
     print("="*40)
@@ -226,20 +292,8 @@ def _accounts_pace(ats: [Account]) -> None:
     print("{:>3}  {:20} {:65} {:8} {:8} {:8} {:8}".format(
         "No.", "Account Name", "", "Reached", "Goal", "Remain", 
         "Rate to remain on task"))
-    for n, a in enumerate(ats, 1): 
-        print(_pce_str(n, a, tf))
-            
-     
-def _budget_total(a: Account, s: str, tf: [(int, int)]) -> int:
-    """Returns sum of Account's attribute over specified timeframe
-    """
-    _sum = 0
-    for y,m in tf: 
-        if y in a.get_budgets():
-            if m in a.get_budgets(y):
-                method_str = "a.get_" + s + "(" + str(y)+ "," + str(m) + ")"
-                _sum += eval(method_str)
-    return _sum
+    for n, (a, totals) in enumerate(zip(ats, aggregate.totals(ats, tf[0], tf[-1], cube)), 1): 
+        print(_pce_str(n, a, totals, pace_int, days_left))
 
 
 def _calculate_pace_placement(tf: [(int, int)], bar_max: int) -> int:
@@ -268,16 +322,13 @@ def _days_remaining(tf: [(int, int)]):
     return days
 
 
-def _pce_str(i: int, a: Account, tf: [(int, int)]) -> str: 
+def _pce_str(i: int, a: Account, totals: aggregate.Totals, pace_int: int, days_left: int) -> str: 
     """Returns string indicating pacing of how goals have been reaching transaction 
     """    
-    bar_len = 60                                            # space in between brackets
-    budget_total  = _budget_total(a, "goal", tf)            # used to place | 
-    reached_total = _budget_total(a, "reached", tf)         # used to place -
-    days_left = _days_remaining(tf)
+    budget_total  = totals.goal                             # used to place | 
+    reached_total = totals.reached                          # used to place -
 
     reach_int       = round((reached_total/budget_total)*60)
-    pace_int        = _calculate_pace_placement(tf, bar_len)
     remain_total    = (budget_total - reached_total)
     ideal_pace      = (budget_total - reached_total)
     if days_left != 0:                                      # Account for division by zero error
@@ -0,0 +1,121 @@
+# account_book.py
+# Registry of Accounts by name, routing Transactions to the Accounts they name
+
+from transaction import Transaction
+from account     import Account
+import changes
+
+
+class AccountBook:
+    def __init__(self, ats: [Account]):
+        """Initializes AccountBook over the list ats. Accounts created by the
+        AccountBook are appended to ats
+        """
+        self._ats       = ats
+        self._by_name   = dict()
+        self._index()
+
+
+    def _index(self) -> None:
+        """Indexes Accounts by name. The first Account of a name is used
+        """
+        self._by_name = dict()
+        for a in self._ats:
+            self._by_name.setdefault(a.get_name(), a)
+
+
+    def __len__(self):
+        return len(self._ats)
+
+
+    def __contains__(self, name: str):
+        return self.get(name) is not None
+
+
+    def __getitem__(self, name: str) -> Account:
+        a = self.get(name)
+        if a is None:
+            raise KeyError("account_book.AccountBook: no Account named {}".format(name))
+        return a
+
+
+    def get(self, name: str, default=None) -> Account:
+        """Returns Account of a name, or default if none exists. Accounts
+        renamed or appended to the list since it was indexed are found by
+        indexing it again
+        """
+        a = self._by_name.get(name)
+        if a is None or a.get_name() != name:
+            self._index()
+            a = self._by_name.get(name)
+        return a if a is not None else default
+
+
+    def get_accounts(self) -> [Account]:
+        return self._ats
+
+
+    def add(self, t: Transaction) -> None:
+        """Adds Transaction to the Accounts of its debit and credit account
+        names, creating an Account for a name not yet used
+        """
+        assert type(t) == Transaction, \
+            "account_book.AccountBook.add: {} is not type Transaction".format(type(t))
+        dr, cr = t.get_dr_account(), t.get_cr_account()
+        for name in ((dr,) if dr == cr else (dr, cr)):
+            a = self.get(name)
+            if a is None:
+                a = Account(name, 0, [t], {})
+                changes.mark(a)
+                self._ats.append(a)
+                self._by_name[name] = a
+            else:
+                a.add(t)
+
+
+    def add_all(self, ts: [Transaction]) -> None:
+        for t in ts:
+            self.add(t)
+
+
+# Testing
+if __name__ == "__main__":
+    import time, account_init
+    from account import Budget
+
+    t0 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t1 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t2 = Transaction(2015, 10, 22, "Drinks", "Savings", "Coffee", 200)
+    ats = [Account("Fast Food", 1, [t0], {2015: {11: Budget(-1000, 300, 1)}})]
+    book = AccountBook(ats)
+    book.add_all([t1, t2])
+    for a in ats:
+        print(a)
+    print("Cash" in book, book["Fast Food"].get_kind())
+
+    ats[0].set_name("Meals")
+    print("Meals" in book, "Fast Food" in book)
+
+    # Testing Budgets of Accounts built by adding, which match those built at once
+    ts = [Transaction(2015, 11, 2, "Cash", "Checking", "Withdrawal", 500),
+          Transaction(2015, 11, 9, "Rent", "Cash", "December", 120000),
+          Transaction(2015, 10, 9, "Rent", "Cash", "November", 120000)]
+    ats = list()
+    AccountBook(ats).add_all(ts)
+    built = {a.get_name(): a.get_budgets() for a in account_init.create_from(ts)}
+    print(all(a.get_budgets() == built[a.get_name()] for a in ats), ats[0].get_budgets())
+
+    # Benchmark: entering 10 Transactions into a ledger of 100,000
+    n = 100000
+    ts = [Transaction(2000 + i % 20, i % 12, i % 28, "Account {}".format(i % 50), "Cash",
+                      "Description", i) for i in range(n)]
+    new = [Transaction(2020, 0, i, "Account {}".format(i), "Cash", "Entered", 100) for i in range(10)]
+
+    ats = account_init.create_from(ts)
+    start = time.perf_counter()
+    account_init.merge_accounts(account_init.create_from(ts + new) + ats)
+    print("Rebuild and merge : {:.3f} s".format(time.perf_counter()-start))
+
+    start = time.perf_counter()
+    AccountBook(ats).add_all(new)
+    print("AccountBook       : {:.3f} s".format(time.perf_counter()-start))
@@ -2,6 +2,7 @@
 # Module to edit Accounts 
 
 from account import Account
+from journal import Goal, Name, Kind
 import basecui as bc
 import valid
 
@@ -20,8 +21,9 @@ BUDGET ANALYSIS MENU
     [esc]    : Return to main menu
 """
 
-def main(ats: [Account]) -> None:
-    """Provides menu/user input to edit accounts
+def main(ats: [Account], jn=None) -> None:
+    """Provides menu/user input to edit accounts. Changes are recorded in
+    the Journal jn if given
     """
     while True: 
         for a in ats: 
@@ -30,11 +32,11 @@ def main(ats: [Account]) -> None:
             print(menu)
             choice = input("Your Choice: ").rstrip()
             if choice == "nam":
-                edit_name(ats)
+                edit_name(ats, jn)
             elif choice == "knd":
-                edit_kind(ats)
+                edit_kind(ats, jn)
             elif choice == "gll":
-                edit_goal(ats)
+                edit_goal(ats, jn)
             elif choice == "esc":
                 break
             else:
@@ -44,7 +46,7 @@ def main(ats: [Account]) -> None:
 
 
 # Edit name
-def edit_name(ats: Account) -> None:
+def edit_name(ats: Account, jn=None) -> None:
     """Prompts user for a new value for Account name
     """
     print("\nEditing Name\n" + ("="*40))
@@ -56,6 +58,8 @@ def edit_name(ats: Account) -> None:
             print("\nInput New Name\n" + ("="*40))
             choice = input("New name (Current name: " + a.get_name() + "): ")
             if bc.binary_question("Confirm new name is " + choice + " ([y]es [n]o): ", "y", "n"): 
+                if jn is not None:
+                    jn.append(Name(a.get_name(), choice))
                 a.set_name(choice)
             if not bc.binary_question("Enter a new name ([y]es or [n]o): ", "y", "n"):
                 break
@@ -64,7 +68,7 @@ def edit_name(ats: Account) -> None:
 
 
 # Edit type 
-def edit_kind(ats: Account) -> None:
+def edit_kind(ats: Account, jn=None) -> None:
     """Prompts user for a new value for Account name
     """
     print("\nEditing Kind\n" + ("="*40))
@@ -82,6 +86,8 @@ def edit_kind(ats: Account) -> None:
                 valid.kind(choice) 
                 if bc.binary_question("Confirm new kind is " + bc.kind_to_str[choice] + " ([y]es [n]o): ", "y", "n"): 
                     a.set_kind(choice)
+                    if jn is not None:
+                        jn.append(Kind(a.get_name(), choice))
                 if not bc.binary_question("Enter a new kind ([y]es or [n]o): ", "y", "n"):
                     break
             except Exception as e: 
@@ -91,7 +97,7 @@ def edit_kind(ats: Account) -> None:
     
     
 # Edit goal for each month
-def edit_goal(ats: Account) -> None: 
+def edit_goal(ats: Account, jn=None) -> None: 
     """Mutates the goal of the selected Account and timeframe. 
     Provides user interface for mutating this information
     """
@@ -113,6 +119,8 @@ def edit_goal(ats: Account) -> None:
                     valid.amount(choice) 
                     if bc.binary_question("Confirm new goal is {:.2f}".format(choice/100) + " ([y]es [n]o): ", "y", "n"): 
                         a.set_goal(y, m, choice)
+                        if jn is not None:
+                            jn.append(Goal(a.get_name(), y, m, choice))
                         break
                 except Exception as e: 
                     print("    An error has occurred: " + str(e))
@@ -0,0 +1,159 @@
+# account_graph_multi.py
+# A class to view many Accounts on one graph, on one scale: a line for each
+# Account, or an area for each kind of Account stacked on those before it
+
+from account import Account
+from basecui import kind_to_str, months
+from cube    import Cube, empty
+from graph   import Graph, standard_font
+
+fields  = ("reached", "goal", "remain")
+palette = ["#00f", "#f00", "#4B8A08", "#f80", "#808", "#088", "#840", "#888", "#000", "#c0c"]
+shades  = ["#ccf", "#fcc", "#cdb", "#fdb", "#dcd", "#cdd", "#dcb", "#ddd", "#bbb", "#fcf"]   # Of areas
+
+
+class MultiAccountGraph(Graph):
+    points = False              # Lines only, which stay readable overlaid
+
+    def __init__(self, ats: [Account], tf: [(int, int)], field="reached", stacked=False,
+                 cube: Cube = None, master=None, window=True):
+        """Initializes MultiAccountGraph of field, one of fields, of the
+        Accounts ats over the months tf. The values of every Account are read
+        from one rollup of cube, a Cube holding ats, built if not given
+        """
+        assert len(ats) != 0, "No Account to graph"
+        assert field in fields, "Field {} is not one of {}".format(field, ", ".join(fields))
+        assert not (stacked and field == "remain"), "Remain may be negative, so it cannot be stacked"
+        self._field     = field
+        self._stacked   = stacked
+        self._cube      = Cube(ats) if cube is None else cube
+        Graph.__init__(self, ats, tf, master, window)
+
+
+    def title(self) -> str:
+        min_year, min_month = self._tf[0][0]+1,  months(self._tf[0][1])
+        max_year, max_month = self._tf[-1][0]+1, months(self._tf[-1][1])
+        return "{} of {} Accounts{} from {} {} to {} {}".format(
+            self._field.capitalize(), len(self._a), " stacked by kind" if self._stacked else "",
+            min_month, min_year, max_month, max_year)
+
+
+    def _value(self, c) -> int:
+        return c.goal - c.reached if self._field == "remain" else getattr(c, self._field)
+
+
+    def series(self) -> {str: [int]}:
+        """Returns values of each Account, or if stacked, the running total
+        of each kind over the kinds before it. Accounts of the cube not in
+        the graph are left out
+        """
+        cells = self._cube.rollup(("account", "month"), start=self._tf[0], end=self._tf[-1])
+        values = dict()
+        for a in sorted(self._a, key=lambda x: (x.get_kind(), x.get_name())):
+            n = kind_to_str[a.get_kind()] if self._stacked else a.get_name()
+            vs = [self._value(cells.get((a.get_name(), ym), empty)) for ym in self._tf]
+            values[n] = [v0 + v1 for v0, v1 in zip(values[n], vs)] if n in values else vs
+        self._order = {n: i for i, n in enumerate(values)}
+        self._own = values                                                      # Of each series, not stacked
+        if self._stacked:
+            below = [0] * len(self._tf)
+            stacked = dict()
+            for n, vs in values.items():
+                below = stacked[n] = [v0 + v1 for v0, v1 in zip(below, vs)]
+            return stacked
+        return values
+
+
+    def _prepare(self) -> None:
+        """Reads the series as Graph does. The values written at stacked
+        points are those of their kind, not the running totals
+        """
+        Graph._prepare(self)
+        self._texts = {n: ["{:.2f}".format(v/100) for v in vs] for n, vs in self._own.items()}
+
+
+    def largest(self, values: {str: [int]}) -> int:
+        """Returns greatest size of a value over every series, the shared
+        scale. Negative values put 0 in the middle of the plot
+        """
+        self._signed = any(v < 0 for vs in values.values() for v in vs)
+        return max(abs(v) for vs in values.values() for v in vs)
+
+
+    def fraction(self, v: int, largest: int) -> float:
+        if largest == 0:
+            return 0.5 if self._signed else 1
+        return (1 - (v/largest)) / 2 if self._signed else 1 - (v/largest)
+
+
+    def color(self, name: str, v: int) -> str:
+        return palette[self._order[name] % len(palette)]
+
+
+    def axes(self, h: int, w: int) -> [(float, float, float, float)]:
+        lines = [(0, h-30, w, h-30), (20, 0, 20, h)]                            # x-axis, y-axis
+        if self._signed:
+            lines.append((20, self.y(0.5, h), w, self.y(0.5, h)))               # Zero
+        return lines
+
+
+    def shapes(self, h: int, w: int) -> [(str, tuple, dict)]:
+        """Returns shapes of Graph, over the areas of the kinds if stacked and
+        under a legend of the series. An area is bounded by the same sampled
+        months as the lines of its kind and the kind below
+        """
+        w_dist = w/len(self._tf)
+        areas = list()
+        if self._stacked:                                                       # One polygon a kind, along its line
+            kept = self._kept(w)
+            bottom = [(25, self.y(1, h)), (w_dist*(len(self._tf)-1) + 25, self.y(1, h))]
+            for n, fs in self._fractions.items():
+                top = [(w_dist*i + 25, self.y(fs[i], h)) for i in kept[n]]
+                areas.append(("polygon", tuple(c for p in top + bottom[::-1] for c in p),
+                              {"fill": shades[self._order[n] % len(shades)], "outline": ""}))
+                bottom = top
+        legend = [("text", (w - 90, 12 + 12*i), {"text": n, "font": standard_font, "fill": self.color(n, 0)})
+                  for n, i in self._order.items()]
+        return areas + Graph.shapes(self, h, w) + legend
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+    from account                import Budget
+    from transaction            import Transaction
+    from account_graph_rate     import AccountGraphRate
+
+    ats = [Account("Fast Food", 1, [Transaction(2015, m, 12, "Fast Food", "Cash", "Wendy's", 100*(m+1)) for m in range(12)], {}),
+           Account("Drinks", 1, [Transaction(2015, m, 12, "Drinks", "Cash", "Coffee", 300) for m in range(12)], {}),
+           Account("Rent", 0, [Transaction(2015, m, 1, "Rent", "Checking", "Rent", 1000) for m in range(12)],
+                   {2015: {0: Budget(goal=800, reached=1000, ts_amt=1)}})]
+    tf = [(2015, m) for m in range(12)]
+    g = MultiAccountGraph(ats, tf, window=False)
+    print(g.title(), g.series()["Drinks"][:3], len(g.shapes(600, 800)))
+    g = MultiAccountGraph(ats, tf, stacked=True, window=False)
+    print(g.title(), {n: vs[:3] for n, vs in g.series().items()}, g.shapes(600, 800)[0][0])
+    g = MultiAccountGraph(ats, tf, "remain", window=False)
+    print(g.series()["Rent"][:3], g._signed)
+
+    # Benchmark: series of 100 Accounts over 120 months, in one rollup and one graph at a time
+    ats = [Account("Account {}".format(n), n % 4,
+                   [Transaction(2010 + i // 12, i % 12, d, "Account {}".format(n), "Cash", "Purchase", 100 + n*i)
+                    for i in range(120) for d in range(0, 28, 7)], {})
+           for n in range(100)]
+    tf = sorted((y, m) for y in ats[0].get_budgets() for m in ats[0].get_budgets(y))
+    start = time.perf_counter()
+    for a in ats:
+        AccountGraphRate(a, tf, window=False)
+    print("A graph an Account : {:.3f} s".format(time.perf_counter()-start))
+    start = time.perf_counter()
+    c = Cube(ats)
+    print("Cube               : {:.3f} s".format(time.perf_counter()-start))
+    start = time.perf_counter()
+    g = MultiAccountGraph(ats, tf, cube=c, window=False)
+    print("One graph          : {:.3f} s, {} items".format(time.perf_counter()-start, len(g.shapes(600, 800))))
+    start = time.perf_counter()
+    g = MultiAccountGraph(ats, tf, stacked=True, cube=c, window=False)
+    print("Stacked            : {:.3f} s, {} items".format(time.perf_counter()-start, len(g.shapes(600, 800))))
+    areas = [s for s in g.shapes(600, 800) if s[0] == "polygon"]
+    print("Polygon points     : {} at most, {} months".format(max(len(s[1]) // 2 for s in areas), len(tf)))
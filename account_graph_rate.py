@@ -1,91 +1,29 @@
 # account_graph_rate.py 
 # Contains a class to view rate of a selected Account's rate of spending/saving. 
 
-import  tkinter  as tk  
 from    account  import Account 
-from    basecui  import months, months_abv, kind_to_str
-from graph import Graph
+from    basecui  import months, kind_to_str
+from    graph    import Graph
 
-standard_font = ("Helvetica", -10)
 
 class AccountGraphRate(Graph): 
-    def __init__(self, a: Account, tf: [(int, int)], master=None):
-        Graph.__init__(self, a, tf, master)
-
-        print(self._tf)
+    def title(self) -> str:
         min_year, min_month = self._tf[0][0]+1,  months(self._tf[0][1])
         max_year, max_month = self._tf[-1][0]+1, months(self._tf[-1][1])
-        self._t.title(
-            "Reached of Account "+ a.get_name()+" ({}) from {} {} to {} {}".format(
-                kind_to_str[a.get_kind()],min_month, min_year, max_month, max_year))
+        return "Reached of Account "+ self._a.get_name()+" ({}) from {} {} to {} {}".format(
+            kind_to_str[self._a.get_kind()],min_month, min_year, max_month, max_year)
 
-        self._canvas = tk.Canvas(master=self._t, height=1200, width=800)
-        self._canvas.grid(row=0,column=0,sticky = tk.N + tk.S + tk.W + tk.E)
-        self._canvas.bind('<Configure>', self._resize)
-            
-        self._t.rowconfigure(0, weight = 1)
-        self._t.columnconfigure(0, weight = 1)
 
+    def series(self) -> {str: [int]}:
+        return {"reached": [self._a.get_reached(y,m) for y,m in self._tf]}
 
-    def _resize(self, event):
-        """Method that is called when canvas is resized. Deletes the current 
-        drawing of the canvas and redraws it to fit the current size of the 
-        canvas
-        """
-        h,w = Graph.reset(self)
-        w_spacing = w/len(self._tf)
-        Graph.draw_axes(self, h, w, 1)
-        self._draw_connections(h, w_spacing)
-        self._draw_points(h, w_spacing)
-        print("Graph Displayed")                                                # Confirmation
 
-    
-    
-    def _draw_points(self, h, w_dist):
-        """Draws to canvas points and their labels
-        """
-        largest = max(self._a.get_reached(y,m) for (y,m) in self._tf)
-        for y,m in self._tf: 
-            perc = 1 - (self._a.get_reached(y,m)/largest)
-            y_point = 10+(perc*(h-10-20))
-            radius = 2
-            
-            self._canvas.create_text(
-                w_dist * self._tf.index((y,m)) + 25, h - 15, 
-                text=months_abv(m)+"\n"+str(y), font=standard_font)             # Labels on the x-axis
+    def color(self, name: str, v: int) -> str:
+        return "#00f"
 
-            self._canvas.create_oval(
-                w_dist * self._tf.index((y,m)) + 25 - radius, y_point-radius, 
-                w_dist * self._tf.index((y,m)) + 25 + radius, y_point+radius,
-                fill="#00f", outline="#00f")                                    # Points
-            
-            self._canvas.create_text(
-                w_dist * self._tf.index((y,m)) + 25 - radius, y_point+10,
-                text="{:.2f}".format(self._a.get_reached(y,m)/100, 2),
-                font=standard_font)                                             # Values
-            
-            
-    def _draw_connections(self, h, w_dist):
-        """Draws onto canvas lines connecting from point to point
-        """
-        largest = max(self._a.get_reached(y,m) for (y,m) in self._tf)
-        for i in range(len(self._tf) - 1): 
-            y0, m0 = self._tf[i][0], self._tf[i][1]
-            y1, m1 = self._tf[i+1][0], self._tf[i+1][1]
-            
-            perc0 = 1 - (self._a.get_reached(y0,m0)/largest)
-            perc1 = 1 - (self._a.get_reached(y1,m1)/largest)
-            
-            y_point0 = 10+(perc0*(h-10-20))
-            y_point1 = 10+(perc1*(h-10-20))
 
-            self._canvas.create_line(
-                w_dist * self._tf.index((y0,m0)) + 25, y_point0, 
-                w_dist * self._tf.index((y1,m1)) + 25, y_point1,
-                fill="#00f")
-            
-    def view(self):
-        Graph.view(self)
+    def axes(self, h: int, w: int) -> [(float, float, float, float)]:
+        return [(0, h-30, w, h-30), (20, 0, 20, h)]                             # x-axis, y-axis
             
 
 # Testing 
@@ -3,6 +3,9 @@
 
 from account import Account
 from trans_view import view, header
+from memo import memoized
+import pager
+import aggregate
 import basecui as bc 
 
 max_char = 100
@@ -45,7 +48,10 @@ def _um_ats(ats: "generator", y: int) -> [int]:
         key=lambda x: bc.months_to_int[x]) + [-1]
 
 
-def main(ats: [Account]) -> None:
+def main(ats: [Account], store=None) -> None:
+    """Requests user prompt to display information about Accounts. Filters 
+    are run as queries against the SQLiteStore store if given
+    """
     while True: 
         assert len(ats) != 0, "No Account collection exists"
         for a in ats:
@@ -56,7 +62,10 @@ def main(ats: [Account]) -> None:
             if choice == "esc":
                 break
             try: 
-                exec("_"+choice+"(ats)")
+                if choice == "cts": 
+                    _cts(ats, store)
+                else: 
+                    exec("_"+choice+"(ats)")
             except: 
                 raise ValueError("Choice {} is not acceptable".format(choice))
         except ValueError as e:
@@ -70,15 +79,13 @@ def _ats(ats: [Account]) -> None:
     """Executes choice to view all Transactions of an Account
     """
     a = bc.select_account(ats)
-    print("\nDisplaying Transactions for {}\n".format(
-        a.get_name())+_display_all_trans(a, bool))
+    print("\nDisplaying Transactions for {}\n".format(a.get_name()))
+    pager.show(header(True), _display_trans(_all_trans(a, bool)))
     
     
-def _cts(ats: [Account]) -> None:
+def _cts(ats: [Account], store=None) -> None:
     """Executes choice to view transactions of an Account over a custom time period
     """
-    def _cond(t): return y0 <= t.get_year() <= y1 and \
-        bc.months_to_int[m0] <= t.get_month() <= bc.months_to_int[m1]
     a = bc.select_account(ats)
     
     print("\nSelect Start Timeframe\n"+("="*40))            # Timeframe selection
@@ -102,7 +109,11 @@ def _cts(ats: [Account]) -> None:
     print(
         "\nDisplaying Transactions for {} from {} {} to {} {}\n".format(
             a.get_name(), m0, y0, m1, y1))
-    print(_display_all_trans(a, _cond))
+    if store is not None: 
+        ts = store.account_ts(a, y0, bc.months_to_int[m0], y1, bc.months_to_int[m1])
+    else: 
+        ts = _tf_trans(a, (y0, bc.months_to_int[m0], y1, bc.months_to_int[m1]))
+    pager.show(header(True), _display_trans(ts))
 
  
 def _omy(ats: [Account]) -> None: 
@@ -157,7 +168,8 @@ def _ocst(ats: [Account]) -> None:
         "\nDisplaying {} with Budgets from {} {} to {} {}".format(
             a.get_name(), m0, y0+1, m1, y1+1))
     print(_view_range_budget(
-        a, sorted(it, key=lambda x: (x[0], x[1]), reverse=True), max_char))
+        a, tuple(sorted(it, key=lambda x: (x[0], x[1]), reverse=True)), max_char))
+    print(_view_range_total(a, (y0,bc.months_to_int[m0]), (y1,bc.months_to_int[m1])))
     
     
 def _acst(ats: [Account]) -> None:
@@ -165,12 +177,8 @@ def _acst(ats: [Account]) -> None:
     """
     def _cond1(y,m):
         return (y0,bc.months_to_int[m0]) <= (y,m) <= (y1,bc.months_to_int[m1])
-    def _cond2(a):
-        for y in range(y0,y1+1):
-            for m in range(bc.months_to_int[m0],bc.months_to_int[m1]+1):
-                if (y in a.get_budgets() and (m in a.get_budgets()[y])):
-                    return True
-        return False 
+    def _cond2(a):                                                              # A Budget in range, with or without Transactions
+        return any(_cond1(y,m) for y in a.get_budgets() for m in a.get_budgets(y))
          
     print("\nSelect Start Timeframe\n"+("="*40))             # Timeframe selection
     y0 = bc.trans_timeframe(_uy(ats))
@@ -210,23 +218,40 @@ def _aaa(ats: [Account]) -> None:
     print(_view_range_budgets(ats, it, max_char))
                 
         
-def _display_all_trans(a: Account, f: "function") -> str:
-    """Returns string of an Account's Transactions objects
+# Selections and renderings of one Account are kept by memo until the Account changes
+@memoized
+def _all_trans(a: Account, f: "function") -> ("Transaction",):
+    """Returns an Account's Transactions objects for which f is true, sorted 
+    by date
+    """
+    return tuple(sorted((t for t in a.get_ts() if f(t)), key=lambda x: x.get_date()))
+
+
+def _display_trans(ts: ["Transaction"]) -> "generator":
+    """Yields numbered rows of Transaction objects already sorted by date, 
+    rendered as they are asked for
+    """
+    return (view(t, n) for n, t in enumerate(ts, 1))
+
+
+@memoized
+def _tf_trans(a: Account, tf: (int, int, int, int)) -> ("Transaction",):
+    """Returns an Account's Transactions whose year is in tf[0] to tf[2] and 
+    whose month is in tf[1] to tf[3], sorted by date
     """
-    ts = sorted((t for t in a.get_ts() if f(t)), 
-                key=lambda x: (x.get_year(), x.get_month(), x.get_day()))
-    return header(True) + "\n" + "\n".join(view(t, ts.index(t)+1) for t in ts)
+    y0, m0, y1, m1 = tf
+    return _all_trans.__wrapped__(
+        a, lambda t: y0 <= t.get_year() <= y1 and m0 <= t.get_month() <= m1)
 
 
-def _display_budget_trans(a: Account, tf: (int, int)) -> str:
-    """Returns string of account Transaction based on timeframe 
+@memoized
+def _budget_trans(a: Account, tf: (int, int)) -> ("Transaction",):
+    """Returns an Account's Transactions of the month tf, sorted by date
     """
-    ts = sorted(
-        (t for t in a.get_ts() if (t.get_year(), t.get_month()) == tf),
-        key=lambda x: (x.get_year(), x.get_month(), x.get_day()))
-    return header(True) + "\n" + "\n".join(view(t, ts.index(t)+1) for t in ts)
+    return _all_trans.__wrapped__(a, lambda t: (t.get_year(), t.get_month()) == tf)
 
 
+@memoized
 def _view_tf_budget(a: Account, tf: (int, int)) -> str:
     """Returns string of Account's budget tuple within timeframe
     """ 
@@ -246,17 +271,29 @@ def _view_tf_budget(a: Account, tf: (int, int)) -> str:
     return "\n"+hd+("="*40)+"\n"+amt_full+reach_full+rem_full
     
 
-def _view_all_budgets(a: Account, width: int) -> str:
-    """Returns string of Account's budget tuple over all time periods.
-    Prints out strings with the specified maximum width  
+@memoized
+def _view_all_budgets(a: Account, width: int, start=aggregate.all_time[0], end=aggregate.all_time[1]) -> str:
+    """Returns string of Account's budget tuple over all time periods, or 
+    those from start to end. Prints out strings with the specified maximum 
+    width  
     """
-    r = sorted(
-        [(y,m) for y in a.get_budgets() for m in a.get_budgets(y)], 
-        key=lambda x: (x[0], x[1]), reverse = True)
+    r = tuple(sorted(
+        [(y,m) for y in a.get_budgets() for m in a.get_budgets(y) if start <= (y,m) <= end], 
+        key=lambda x: (x[0], x[1]), reverse = True))
     return "\n"+_view_range_budget(a, r, width)
     
     
-def _view_range_budget(a: Account, timeframe: [(int, int)], width: int) -> str:
+def _view_range_total(a: Account, start: (int, int), end: (int, int)) -> str:
+    """Returns string of Account's Budgets summed over the months from start 
+    to end
+    """
+    goal, reached = a.range_total("goal", start, end), a.range_total("reached", start, end)
+    return "Totals: Goal {:.2f}, Reached {:.2f}, Remaining {:.2f}, Transactions {}".format(
+        goal/100, reached/100, (goal-reached)/100, a.range_total("ts_amt", start, end))
+
+
+@memoized
+def _view_range_budget(a: Account, timeframe: ((int, int),), width: int) -> str:
     """Returns string of Account's budget tuple over a certain time period
     """
     bud_lim = ((width-10)//11)                                                  # How many budgets can be on one line
@@ -359,13 +396,18 @@ if __name__ == "__main__":
     a1 = Account("Drinks", 0, [t14], {})
     a2 = Account("Fast Food", 0, [t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13], {})
         
-    print(_display_all_trans(a1, bool))
-    print(_display_all_trans(a2, bool))
+    pager.show(header(True), _display_trans(_all_trans(a1, bool)))
+    pager.page_rows = 0
+    pager.show(header(True), _display_trans(_all_trans(a2, bool)))
+    pager.page_rows = 20
  
-    print(_display_budget_trans(a1, (2015, 11)))
+    pager.show(header(True), _display_trans(_budget_trans(a1, (2015, 11))))
  
     print(_view_tf_budget(a1, (2016, 10)))
     print(_view_all_budgets(a1, 150))
     print(_view_all_budgets(a2, 150))
+    print(_view_all_budgets(a2, 150) == _view_all_budgets(a2, 150))
+    import memo
+    print(memo.cache.stats())
 
     main([a1, a2])
@@ -0,0 +1,92 @@
+# aggregate.py
+# Totals of Budgets and Transaction amounts for many Accounts over one timeframe
+
+from account     import Account
+from cube        import Cube, empty
+from collections import namedtuple
+
+Totals = namedtuple("Totals", "goal reached remain ts_amt amount")
+# goal, reached, remain, ts_amt:    Budget attributes summed over the timeframe
+# amount:                           sum of the (unsigned) amounts of the Transactions
+
+all_time = ((-1, -1), (9999, 11))       # Timeframe covering every month
+
+
+def months(ats: [Account]) -> [(int, int)]:
+    """Returns sorted (year, month) of every Budget of the Accounts, each once
+    """
+    return sorted(set((y, m) for a in ats for y in a.get_budgets() for m in a.get_budgets(y)))
+
+
+def totals(ats: [Account], start: (int, int), end: (int, int), cube: Cube = None) -> [Totals]:
+    """Returns Totals of each Account, in the order of ats, over the months
+    from start to end inclusive. Read from one rollup of cube, which must
+    hold the Accounts, or of a Cube built for them if not given
+    """
+    if cube is None:
+        cube = Cube(ats)
+    cells = cube.rollup("account", start=start, end=end)
+    result = list()
+    for a in ats:
+        c = cells.get(a.get_name(), empty)
+        result.append(Totals(c.goal, c.reached, c.goal - c.reached, c.count, c.amount))
+    return result
+
+
+# Testing
+if __name__ == "__main__":
+    import io, time, contextlib, account_analysis
+    from transaction    import Transaction
+    from account        import Budget
+    from calendar       import monthrange
+    from datetime       import date
+
+    t0 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t1 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    ats = [Account("Fast Food", 0, [t0, t1], {2015: {11: Budget(-1000, 300, 1)}}),
+           Account("Cash", 0, [t0, t1], {})]
+    print(months(ats))
+    print(totals(ats, (2015, 0), (2015, 10)))
+    print(totals(ats, *all_time))
+
+    # Benchmark: the pace report of 500 Accounts over 120 months
+    def budget_total_by_eval(a, s, tf):
+        """Previous implementation, evaluating a getter call per month
+        """
+        _sum = 0
+        for y,m in tf:
+            if y in a.get_budgets():
+                if m in a.get_budgets(y):
+                    _sum += eval("a.get_" + s + "(" + str(y)+ "," + str(m) + ")")
+        return _sum
+
+    def accounts_pace_by_eval(ats, n):
+        """Previous report for the first n Accounts: every month of every
+        Account as the timeframe, and every total and day count taken again for
+        each Account
+        """
+        tf = [(y,m) for a in ats for y in a.get_budgets() for m in a.get_budgets(y)]
+        for a in ats[:n]:
+            budget_total  = budget_total_by_eval(a, "goal", tf)
+            reached_total = budget_total_by_eval(a, "reached", tf)
+            days_before = sum(monthrange(y+1,m+1)[1] for y,m in tf
+                              if (y,m) <= (date.today().year, date.today().month))
+            days = sum(monthrange(y+1,m+1)[1] for y,m in tf)
+            print(a.get_name(), budget_total, reached_total, days_before/days)
+
+    ats = [Account("Account {}".format(i), 0,
+                   [Transaction(2010 + j // 12, j % 12, 1, "Account {}".format(i), "Cash",
+                                "Description", 100 + i) for j in range(120)], {})
+           for i in range(500)]
+
+    n = 2                                                   # Linear in Accounts; extrapolated
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        accounts_pace_by_eval(ats, n)
+        eval_secs = (time.perf_counter() - start) * len(ats)/n
+
+        start = time.perf_counter()
+        account_analysis._accounts_pace(ats)
+        engine_secs = time.perf_counter() - start
+    print("eval per month : an estimated {:.0f} s".format(eval_secs))
+    print("aggregate      : {:.3f} s".format(engine_secs))
@@ -182,12 +182,6 @@ def select_account(it: [Account]) -> Account:
         
 
 def remove_duplicates(ts: ["Transaction"]) -> ["Transaction"]:
-    """Removes duplicates in a list of Transactions
+    """Removes duplicates in a list of Transactions, keeping the first of each
     """
-    iterated = list() 
-    unique_ts= list() 
-    for t in ts: 
-        if t not in iterated: 
-            unique_ts.append(t)
-            iterated.append(t)
-    return unique_ts
\ No newline at end of file
+    return list(dict.fromkeys(ts))
\ No newline at end of file
@@ -0,0 +1,93 @@
+# changes.py
+# Tracks the Transactions and Accounts changed since the ledger was last written,
+# and the recent changes the indexes of the ledger have yet to catch up with
+
+from itertools import islice
+
+# Objects are keyed by id(): an Account is not hashable, and a Transaction hashes
+# by its key(), which equal copies share and every edit changes
+_dirty      = dict()
+_removed    = dict()
+_log        = dict()    # id() of changed object -> (generation of its last change, object, removed), oldest first
+
+generation  = 0         # Incremented on every change to the ledger
+horizon     = 0         # Changes after this generation are all in the log
+log_limit   = 100000    # Objects kept in the log; the older half is dropped past this
+
+
+def _record(obj, removed: bool) -> None:
+    global generation, horizon, _log
+    generation += 1
+    _log.pop(id(obj), None)
+    _log[id(obj)] = (generation, obj, removed)
+    if len(_log) > log_limit:                                                   # Trimmed in one pass, not one object at a time
+        dropped = len(_log) - log_limit // 2
+        horizon = next(islice(_log.values(), dropped - 1, None))[0]
+        _log = dict(islice(_log.items(), dropped, None))
+
+
+def mark(obj) -> None:
+    """Records that obj was created or mutated
+    """
+    _dirty[id(obj)] = obj
+    _removed.pop(id(obj), None)
+    _record(obj, False)
+
+
+def mark_removed(obj) -> None:
+    """Records that obj was deleted from the ledger
+    """
+    _removed[id(obj)] = obj
+    _dirty.pop(id(obj), None)
+    _record(obj, True)
+
+
+def is_dirty() -> bool:
+    """Returns True if anything changed since the last call to clear
+    """
+    return len(_dirty) != 0 or len(_removed) != 0
+
+
+def dirty() -> [object]:
+    """Returns objects created or mutated since the last call to clear
+    """
+    return list(_dirty.values())
+
+
+def _since(g: int, removed: bool) -> [object]:
+    result = list()
+    for i in reversed(_log):
+        gen, obj, r = _log[i]
+        if gen <= g:
+            break
+        if r == removed:
+            result.append(obj)
+    return result
+
+
+def dirty_since(g: int) -> [object]:
+    """Returns objects created or mutated after generation g, whether or not
+    the ledger was written since. Only changes after horizon are known, so
+    g must not be older
+    """
+    return _since(g, False)
+
+
+def removed_since(g: int) -> [object]:
+    """Returns objects deleted after generation g, as dirty_since
+    """
+    return _since(g, True)
+
+
+def removed() -> [object]:
+    """Returns objects deleted since the last call to clear
+    """
+    return list(_removed.values())
+
+
+def clear() -> None:
+    """Forgets the changes not yet written. Call once the ledger has been
+    written. The log read by dirty_since and removed_since is kept
+    """
+    _dirty.clear()
+    _removed.clear()
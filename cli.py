@@ -0,0 +1,320 @@
+# cli.py
+# Runs ledger tasks from the command line, without prompts, for scripted jobs.
+# The one exception is import --confirm, which asks on the terminal
+#
+#   python cli.py [--time] load    FILE
+#   python cli.py [--time] import  FILE SOURCE [--account NAME] [--counter NAME]
+#                                  [--columns FIELD=HEADING,...] [--date-format F]
+#                                  [--delimiter C] [--skip-invalid] [--window DAYS]
+#                                  [--confirm]
+#   python cli.py [--time] report  FILE {breakdown,pace,budgets} [--kind K]
+#                                  [--account NAME] [--start Y-M] [--end Y-M]
+#   python cli.py [--time] graphs  FILE DIRECTORY [--account NAME] [--start Y-M]
+#                                  [--end Y-M] [--format {svg,png}] [--height H]
+#                                  [--width W] [--by-year] [--jobs N]
+#   python cli.py [--time] export  FILE OUTPUT
+#   python cli.py [--time] compact FILE
+
+from transaction    import Transaction
+from save           import row_names
+import main_menu
+import importer
+import reconcile
+import account_book
+import account_analysis
+import account_view
+import aggregate
+import cube
+import journal
+import changes
+import ledger_parser
+import save
+import sqlite_store
+import render
+import basecui      as bc
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+
+def _month(s: str) -> (int, int):
+    """Returns zero-based (year, month) of a "YYYY-M" argument
+    """
+    try:
+        y, m = s.split("-")
+        y, m = int(y) - 1, int(m) - 1
+        assert 0 <= y <= 9999 and 0 <= m <= 11
+    except Exception:
+        raise argparse.ArgumentTypeError("{} is not a month as YYYY-M".format(s))
+    return y, m
+
+
+def _load(filename: str, create=False) -> tuple:
+    """Returns session of main_menu.load, without the messages printed while
+    reading a text data file. A missing data file is an error, unless create
+    """
+    if not create and not os.path.isfile(filename):
+        raise FileNotFoundError("{} does not exist".format(filename))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return main_menu.load(filename)
+
+
+def load(args) -> None:
+    """Reads the ledger, applying its journal, and prints what it holds
+    """
+    store, jn, var, ats, ts = _load(args.file)
+    print("{}: {} Transactions, {} Accounts, {} journal records".format(
+        args.file, len(ts), len(ats), 0 if jn is None else len(jn)))
+    if store is not None:
+        store.close()
+
+
+def read_transactions(filename: str) -> [Transaction]:
+    """Returns Transactions of the transaction table of a data file, or of
+    Transaction lines
+    """
+    with open(filename) as f:
+        return [r for n, r in ledger_parser.parse(f, row_names) if type(r) == Transaction]
+
+
+def add(ts: [Transaction], new: [Transaction], ats, jn, store, var) -> [Transaction]:
+    """Adds to the ledger, in one write, the Transactions of new not already in
+    it. Returns those added
+    """
+    seen = set(ts)
+    added = list()
+    for t in new:
+        if t not in seen:
+            seen.add(t)
+            added.append(t)
+            changes.mark(t)
+    ts += added
+    account_book.AccountBook(ats).add_all(added)
+    if store is not None:
+        store.write_changes(ts, ats, var)
+    elif len(added) != 0:
+        jn.append(*(journal.Add(t) for t in added))
+        if len(jn) >= journal.compact_every:
+            with contextlib.redirect_stdout(io.StringIO()):
+                jn.compact(ts, ats, var)
+    return added
+
+
+def _columns(s: str) -> {str: str}:
+    """Returns column mapping of a "field=heading,..." argument
+    """
+    try:
+        columns = dict(pair.split("=", 1) for pair in s.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("{} is not a list of field=heading".format(s))
+    return {k.strip(): v.strip() for k, v in columns.items()}
+
+
+def read_statement(args) -> [Transaction]:
+    """Returns Transactions of a CSV or OFX/QFX statement. Every line is
+    checked before any is returned: unless args.skip_invalid, one invalid 
+    line stops the import
+    """
+    assert args.account is not None, "--account is required to import a statement"
+    options = dict(date_format=args.date_format, delimiter=args.delimiter)
+    if args.columns is not None:
+        options["columns"] = args.columns
+    if args.source.lower().endswith((".ofx", ".qfx")):
+        options = dict()
+    lines, problems = importer.read(args.source, **options)
+    for p in problems[:10]:
+        print("    {} line {}: {}".format(args.source, p.lineno, p.error), file=sys.stderr)
+    if len(problems) > 10:
+        print("    ... and {} more".format(len(problems) - 10), file=sys.stderr)
+    assert len(problems) == 0 or args.skip_invalid, \
+        "{} lines are invalid, so nothing was imported".format(len(problems))
+    return importer.transactions(lines, args.account, args.counter)
+
+
+def reconciled(new: [Transaction], ts: [Transaction], args) -> [Transaction]:
+    """Returns the Transactions of new to add after reconciling them with the
+    ledger ts: those not in it, and the conflicts the user confirms if 
+    args.confirm, asked on the terminal. Other conflicts are left out
+    """
+    if args.confirm and not sys.stdin.isatty():
+        raise ValueError("--confirm asks which lines to add, so it needs a terminal")
+    r = reconcile.reconcile(new, ts, args.account, args.window)
+    print("{}: {} already in the ledger, {} new, {} conflicting".format(
+        args.source, len(r.matched), len(r.new), len(r.conflicts)))
+    if args.confirm:
+        return r.new + reconcile.confirm(r.conflicts)
+    return r.new
+
+
+def import_(args) -> None:
+    """Adds the Transactions of another data file, or of a bank statement, to
+    the ledger
+    """
+    store, jn, var, ats, ts = _load(args.file, create=True)
+    if args.source.lower().endswith((".csv", ".ofx", ".qfx")):
+        read = read_statement(args)
+        new = reconciled(read, ts, args)
+    else:
+        read = new = read_transactions(args.source)
+    added = add(ts, new, ats, jn, store, var)
+    print("{}: {} Transactions read, {} added".format(args.source, len(read), len(added)))
+    if store is not None:
+        store.close()
+
+
+def report(args) -> None:
+    """Prints a report of the Accounts
+    """
+    store, jn, var, ats, ts = _load(args.file)
+    if args.account is not None:
+        ats = [a for a in ats if a.get_name() == args.account]
+        assert len(ats) != 0, "Account {} does not exist".format(args.account)
+    if args.account_kind is not None:
+        ats = [a for a in ats if a.get_kind() == args.account_kind]
+    assert len(ats) != 0, "No Account exists"
+
+    if args.report == "breakdown":
+        analysis_cube = cube.Cube(ats)
+        filtered = args.account is not None or args.account_kind is not None
+        for k in sorted(set(a.get_kind() for a in ats)):                        # The store totals every Account of a kind
+            account_analysis._breakdown_table(ats, k, args.start, args.end, None if filtered else store, analysis_cube)
+    elif args.report == "pace":
+        account_analysis._accounts_pace(ats, cube.Cube(ats), args.start, args.end)
+    elif args.report == "budgets":
+        for a in sorted(ats, key=lambda x: x.get_name()):
+            print(account_view._view_all_budgets(a, args.width, args.start, args.end))
+    if store is not None:
+        store.close()
+
+
+def graphs(args) -> None:
+    """Writes the rate, compare and cash flow charts of the Accounts to files,
+    without a window
+    """
+    store, jn, var, ats, ts = _load(args.file)
+    if args.account is not None:
+        ats = [a for a in ats if a.get_name() == args.account]
+        assert len(ats) != 0, "Account {} does not exist".format(args.account)
+    start = time.perf_counter()
+    results = render.batch(ats, args.directory, args.start, args.end, args.format, args.height, args.width,
+                           args.by_year, args.jobs)
+    print("{}: {}".format(args.directory, render.summary(results, time.perf_counter()-start)))
+    if store is not None:
+        store.close()
+
+
+def export(args) -> None:
+    """Writes the ledger to another file, a SQLite database if its name ends
+    in one of sqlite_store.extensions
+    """
+    store, jn, var, ats, ts = _load(args.file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if sqlite_store.is_database(args.output):
+            sqlite_store.main(ts, ats, var, args.output)
+        else:
+            save.main(ts, ats, var, args.output)
+    print("{}: {} Transactions, {} Accounts written".format(args.output, len(ts), len(ats)))
+    if store is not None:
+        store.close()
+
+
+def compact(args) -> None:
+    """Folds the journal into the text data file
+    """
+    store, jn, var, ats, ts = _load(args.file)
+    if store is not None:
+        store.close()
+        print("{}: a database has no journal to compact".format(args.file))
+        return
+    records = len(jn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        jn.compact(ts, ats, var)
+    print("{}: {} journal records folded into the data file".format(args.file, records))
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Run ledger tasks without prompts")
+    p.add_argument("--time", action="store_true", help="print seconds taken to standard error")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("load", help="read the ledger and print what it holds")
+    s.add_argument("file")
+    s.set_defaults(run=load)
+
+    s = sub.add_parser("import", help="add the Transactions of another data file, or of a "
+                                      "CSV or OFX/QFX bank statement")
+    s.add_argument("file")
+    s.add_argument("source")
+    s.add_argument("--account", help="Account of the statement")
+    s.add_argument("--counter", default="Uncategorized",
+                   help="Account on the other side of each statement line")
+    s.add_argument("--columns", type=_columns,
+                   help="CSV headings of date, description and amount, or debit and credit, "
+                        "as field=heading,...")
+    s.add_argument("--date-format", default=importer.date_format, help="CSV date format")
+    s.add_argument("--delimiter", default=",", help="CSV delimiter")
+    s.add_argument("--skip-invalid", action="store_true", help="import the valid lines only")
+    s.add_argument("--window", type=int, default=reconcile.window,
+                   help="days apart a statement line and a ledger Transaction may be and match")
+    s.add_argument("--confirm", action="store_true",
+                   help="ask on the terminal which conflicting statement lines to add, rather than "
+                        "leave them out; not for scripted jobs")
+    s.set_defaults(run=import_)
+
+    s = sub.add_parser("report", help="print a breakdown, pace or budgets report")
+    s.add_argument("file")
+    s.add_argument("report", choices=("breakdown", "pace", "budgets"))
+    s.add_argument("--account", help="only the Account of this name")
+    s.add_argument("--kind", dest="account_kind", type=int, choices=sorted(bc.kind_to_str),
+                   help="only Accounts of this kind")
+    s.add_argument("--start", type=_month, default=aggregate.all_time[0], help="first month, as YYYY-M")
+    s.add_argument("--end", type=_month, default=aggregate.all_time[1], help="last month, as YYYY-M")
+    s.add_argument("--width", type=int, default=account_view.max_char, help="line width for budgets")
+    s.set_defaults(run=report)
+
+    s = sub.add_parser("graphs", help="write the charts of every Account to SVG or PNG files")
+    s.add_argument("file")
+    s.add_argument("directory")
+    s.add_argument("--account", help="only the Account of this name")
+    s.add_argument("--start", type=_month, default=aggregate.all_time[0], help="first month, as YYYY-M")
+    s.add_argument("--end", type=_month, default=aggregate.all_time[1], help="last month, as YYYY-M")
+    s.add_argument("--format", default="svg", choices=render.formats, help="file format")
+    s.add_argument("--height", type=int, default=render.height, help="height in pixels")
+    s.add_argument("--width", type=int, default=render.width, help="width in pixels")
+    s.add_argument("--by-year", action="store_true", help="charts of each year, rather than of every month")
+    s.add_argument("--jobs", type=int, default=None,
+                   help="worker processes, as many as there are CPUs if not given")
+    s.set_defaults(run=graphs)
+
+    s = sub.add_parser("export", help="write the ledger to a text or .db file")
+    s.add_argument("file")
+    s.add_argument("output")
+    s.set_defaults(run=export)
+
+    s = sub.add_parser("compact", help="fold the journal into the data file")
+    s.add_argument("file")
+    s.set_defaults(run=compact)
+    return p
+
+
+def main(argv=None) -> int:
+    """Runs the command of argv. Returns exit status
+    """
+    args = parser().parse_args(argv)
+    start = time.perf_counter()
+    try:
+        args.run(args)
+    except Exception as e:
+        print("    An error has occurred: {}".format(e), file=sys.stderr)
+        return 1
+    finally:
+        if args.time:
+            print("{}: {:.3f} s".format(args.command, time.perf_counter()-start), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
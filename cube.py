@@ -0,0 +1,144 @@
+# cube.py
+# Totals by Account kind, Account, year and month, kept for the analysis menu
+
+from account           import Account
+from transaction_store import TransactionStore
+from collections       import namedtuple
+
+Cell = namedtuple("Cell", "amount count goal reached")
+# amount:           sum of the (unsigned) amounts of the month's Transactions
+# count:            number of the month's Transactions
+# goal, reached:    of the month's Budget
+
+empty = Cell(0, 0, 0, 0)
+
+# Key of a cell when rolled up by each dimension
+_dimensions = {
+    "kind":     lambda k, n, y, m: k,
+    "account":  lambda k, n, y, m: n,
+    "year":     lambda k, n, y, m: y,
+    "quarter":  lambda k, n, y, m: (y, m // 3),
+    "month":    lambda k, n, y, m: (y, m)}
+
+
+def _add(c0: Cell, c1: Cell) -> Cell:
+    return Cell(c0.amount + c1.amount, c0.count + c1.count,
+                c0.goal + c1.goal, c0.reached + c1.reached)
+
+
+class Cube:
+    def __init__(self, ats: [Account]):
+        """Initializes Cube over the list ats. Accounts appended to, changed in
+        or removed from ats are picked up by refresh
+        """
+        self._ats       = ats
+        self._accounts  = dict()        # id() of Account -> (Account, generation, kind, name, {(y, m): Cell})
+        self._rollups   = dict()        # Arguments of rollup -> result, until the cells change
+        self.refresh()
+
+
+    def refresh(self) -> int:
+        """Rebuilds the cells of Accounts added or changed since the last
+        refresh and drops those of Accounts removed. Returns number of Accounts
+        rebuilt
+        """
+        current = set(id(a) for a in self._ats)
+        removed = [i for i in self._accounts if i not in current]
+        for i in removed:
+            del self._accounts[i]
+        stale = [a for a in self._ats
+                 if id(a) not in self._accounts or self._accounts[id(a)][1] != a.get_gen()]
+        if len(stale) != 0 or len(removed) != 0:
+            self._rollups.clear()
+        if len(stale) != 0:
+            monthly = TransactionStore().monthly_totals(stale, signed=False)
+            for a in stale:
+                self._accounts[id(a)] = (a, a.get_gen(), a.get_kind(), a.get_name(),
+                                         Cube._cells(a, monthly[a.get_name()]))
+        return len(stale)
+
+
+    @staticmethod
+    def _cells(a: Account, amounts: {(int, int): int}) -> {(int, int): Cell}:
+        """Returns cells of an Account by month, from its Budgets and the
+        amounts of its Transactions by month
+        """
+        cells = dict()
+        for y in a.get_budgets():
+            for m, b in a.get_budgets(y).items():
+                cells[(y, m)] = Cell(amounts.get((y, m), 0), b.ts_amt, b.goal, b.reached)
+        for k, v in amounts.items():
+            if k not in cells:
+                cells[k] = Cell(v, 0, 0, 0)
+        return cells
+
+
+    def _select(self, kind, account, start, end) -> "generator":
+        """Yields (kind, name, year, month, Cell) of the cells matching the
+        filters given
+        """
+        for _, _, k, n, cells in self._accounts.values():
+            if (kind is None or k == kind) and (account is None or n == account):
+                for (y, m), c in cells.items():
+                    if start <= (y, m) <= end:
+                        yield k, n, y, m, c
+
+
+    def slice(self, kind=None, account=None, start=(-1, -1), end=(9999, 11)) -> {tuple: Cell}:
+        """Returns dictionary of (kind, Account name, year, month) to Cell,
+        for the cells of a kind and/or Account name from month start to month
+        end inclusive
+        """
+        return {(k, n, y, m): c for k, n, y, m, c in self._select(kind, account, start, end)}
+
+
+    def rollup(self, by, kind=None, account=None, start=(-1, -1), end=(9999, 11)) -> {object: Cell}:
+        """Returns dictionary of key to the sum of the cells with that key, for
+        the cells selected as by slice. by is one of "kind", "account",
+        "year", "quarter" and "month", or a tuple of them for a tuple key.
+        Results are kept until refresh finds a change
+        """
+        args = (by, kind, account, start, end)
+        if args not in self._rollups:
+            keys = [_dimensions[d] for d in ((by,) if type(by) == str else by)]
+            result = dict()
+            for k, n, y, m, c in self._select(kind, account, start, end):
+                key = keys[0](k, n, y, m) if len(keys) == 1 else tuple(f(k, n, y, m) for f in keys)
+                result[key] = _add(result.get(key, empty), c)
+            self._rollups[args] = result
+        return dict(self._rollups[args])
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+    from transaction import Transaction
+
+    t0 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t1 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t2 = Transaction(2016, 0, 2, "Drinks", "Cash", "Coffee", 200)
+    ats = [Account("Fast Food", 1, [t0, t1], {}), Account("Drinks", 1, [t2], {}),
+           Account("Cash", 3, [t0, t1, t2], {})]
+    c = Cube(ats)
+    print(c.rollup("kind"))
+    print(c.rollup("quarter", kind=1))
+    print(c.rollup(("account", "year"), start=(2015, 11)))
+    ats[1].add(Transaction(2016, 0, 3, "Drinks", "Cash", "Tea", 100))
+    print(c.refresh(), c.slice(account="Drinks"))
+
+    # Benchmark: refreshing after one Account changed, of 500 Accounts of 120 months
+    ats = [Account("Account {}".format(i), i % 4,
+                   [Transaction(2010 + j // 12, j % 12, 1, "Account {}".format(i), "Cash",
+                                "Description", 100 + i) for j in range(120)], {})
+           for i in range(500)]
+    start = time.perf_counter()
+    c = Cube(ats)
+    print("Build       : {:.3f} s".format(time.perf_counter()-start))
+    ats[0].add(Transaction(2015, 0, 2, "Account 0", "Cash", "Description", 1))
+    start = time.perf_counter()
+    c.refresh()
+    print("Refresh     : {:.3f} s".format(time.perf_counter()-start))
+    for run in ("first", "again"):
+        start = time.perf_counter()
+        c.rollup("kind")
+        print("Rollup kind : {:.3f} s, {}".format(time.perf_counter()-start, run))
@@ -0,0 +1,145 @@
+# fenwick.py
+# Fenwick trees, for sums of values over ranges of months
+
+class Fenwick:
+    """Binary indexed tree over a list of values. Changes a value and sums a
+    range of values in O(log n)
+    """
+    def __init__(self, values: [int] = ()):
+        self._values    = list(values)
+        self._tree      = [0] + self._values
+        n = len(self._values)
+        for j in range(1, n+1):                                                 # Built in O(n)
+            k = j + (j & -j)
+            if k <= n:
+                self._tree[k] += self._tree[j]
+
+
+    def __len__(self):
+        return len(self._values)
+
+
+    def __getitem__(self, i: int):
+        return self._values[i]
+
+
+    def get_values(self) -> list:
+        return list(self._values)
+
+
+    def add(self, i: int, d) -> None:
+        """Adds d to the value at position i
+        """
+        self._values[i] += d
+        j = i + 1
+        while j < len(self._tree):
+            self._tree[j] += d
+            j += j & -j
+
+
+    def set(self, i: int, v) -> None:
+        """Replaces the value at position i with v
+        """
+        if v != self._values[i]:
+            self.add(i, v - self._values[i])
+
+
+    def prefix(self, i: int):
+        """Returns sum of the values before position i
+        """
+        s = 0
+        j = min(i, len(self._values))
+        while j > 0:
+            s += self._tree[j]
+            j -= j & -j
+        return s
+
+
+    def total(self, lo: int, hi: int):
+        """Returns sum of the values from position lo to position hi inclusive.
+        Positions outside the tree hold 0
+        """
+        lo, hi = max(lo, 0), min(hi, len(self._values)-1)
+        if lo > hi:
+            return 0
+        return self.prefix(hi+1) - self.prefix(lo)
+
+
+class MonthTree:
+    """Fenwick tree of values by (year, month). Covers the months between the
+    first and last set, and is rebuilt with room to spare when a month outside
+    them is set
+    """
+    spare = 12                                  # Months added on each side when rebuilt
+
+    def __init__(self):
+        self._first = 0                         # Month index (year * 12 + month) of position 0
+        self._tree  = Fenwick()
+
+
+    def _position(self, y: int, m: int) -> int:
+        i = y*12 + m - self._first
+        if not 0 <= i < len(self._tree):
+            values = self._tree.get_values()
+            first  = min(self._first, y*12 + m) if len(values) != 0 else y*12 + m
+            last   = max(self._first + len(values) - 1, y*12 + m) if len(values) != 0 else y*12 + m
+            first -= MonthTree.spare
+            last  += MonthTree.spare
+            padded = [0] * (last - first + 1)
+            padded[self._first - first:self._first - first + len(values)] = values
+            self._first, self._tree = first, Fenwick(padded)
+            i = y*12 + m - self._first
+        return i
+
+
+    def get(self, y: int, m: int):
+        i = y*12 + m - self._first
+        return self._tree[i] if 0 <= i < len(self._tree) else 0
+
+
+    def set(self, y: int, m: int, v) -> None:
+        if v != self.get(y, m):
+            i = self._position(y, m)                                            # May replace the tree
+            self._tree.set(i, v)
+
+
+    def total(self, start: (int, int), end: (int, int)):
+        """Returns sum of the values from month start to month end inclusive
+        """
+        return self._tree.total(start[0]*12 + start[1] - self._first,
+                                end[0]*12 + end[1] - self._first)
+
+
+# Testing
+if __name__ == "__main__":
+    import random, time
+
+    values = [random.randint(-1000, 1000) for _ in range(1000)]
+    f = Fenwick(values)
+    for _ in range(1000):
+        i = random.randrange(len(values))
+        values[i] = random.randint(-1000, 1000)
+        f.set(i, values[i])
+        lo, hi = sorted(random.randrange(len(values)) for _ in range(2))
+        assert f.total(lo, hi) == sum(values[lo:hi+1])
+
+    t = MonthTree()
+    t.set(2015, 3, 100); t.set(2013, 11, 50); t.set(2020, 0, 7)
+    print(t.total((2013, 0), (2015, 11)), t.total((2015, 4), (2030, 0)), t.total((1990, 0), (2040, 0)))
+
+    # Benchmark: sums over ranges of a 50 year ledger of months
+    months = [(y, m) for y in range(1980, 2030) for m in range(12)]
+    t = MonthTree()
+    for y, m in months:
+        t.set(y, m, y + m)
+    d = {k: k[0] + k[1] for k in months}
+    ranges = [sorted(random.sample(months, 2)) for _ in range(10000)]
+
+    start = time.perf_counter()
+    by_scan = [sum(v for k, v in d.items() if s <= k <= e) for s, e in ranges]
+    print("Scan        : {:.3f} s".format(time.perf_counter()-start))
+
+    start = time.perf_counter()
+    by_tree = [t.total(s, e) for s, e in ranges]
+    print("Fenwick tree: {:.3f} s".format(time.perf_counter()-start))
+    assert by_scan == by_tree
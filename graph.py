@@ -1,49 +1,296 @@
-# Base class for AccountGraphCashFlow, AccountGraphRate, and 
-# AccountGraphCompare.
+# graph.py
+# Base class for AccountGraphCashFlow, AccountGraphRate, and
+# AccountGraphCompare. The values of a graph are read from its Account once;
+# a resize only lays the cached values out again, moving the canvas items
+# already drawn. Series longer than the width holds are downsampled, so the
+# number of items stays bounded by the width rather than the timeframe
+
+from account import Account
+from basecui import months_abv
+
+try:                                                # Tk is needed only to show a graph
+    import tkinter as tk                            # in a window; render writes files
+except ImportError:                                 # without it
+    tk = None
+
+standard_font   = ("Helvetica", -10)
+radius          = 2             # Of the points
+debounce_ms     = 40            # Resizes closer together than this are drawn once
+point_px        = 8             # Least pixels between points of a series
+label_px        = 40            # Least pixels between labels on the x-axis
+text_px         = 36            # Least pixels between points for their values to be written
+
+
+def lttb(values: [float], n: int) -> [int]:
+    """Returns sorted indices of n of values chosen by Largest-Triangle-
+    Three-Buckets: the first and last, and from each of n-2 buckets between
+    them the one making the largest triangle with the one chosen before it
+    and the average of the next bucket. Peaks and troughs are kept
+    """
+    size = len(values)
+    if n >= size:
+        return list(range(size))
+    if n < 3:
+        return [0, size-1][:n]
+    every = (size-2) / (n-2)
+    a = 0
+    result = [0]
+    for i in range(n-2):
+        lo, hi = int(i*every) + 1, int((i+1)*every) + 1                         # This bucket
+        start, end = hi, min(int((i+2)*every) + 1, size)                        # Next bucket
+        avg_x = (start + end - 1) / 2
+        avg_y = sum(values[start:end]) / (end - start)
+        largest, chosen = -1, lo
+        for j in range(lo, hi):
+            area = abs((a - avg_x) * (values[j] - values[a]) - (a - j) * (avg_y - values[a]))
+            if area > largest:
+                largest, chosen = area, j
+        result.append(chosen)
+        a = chosen
+    result.append(size-1)
+    return result
 
-from account import Account 
-import tkinter as tk
 
 class Graph:
-    def __init__(self, a: Account, tf: [(int, int)], master=None):
+    points = True               # Whether points and their values are drawn
+
+    def __init__(self, a: Account, tf: [(int, int)], master=None, window=True):
+        """Initializes Graph of Account a over the months tf. A Tk window is
+        opened only if window; without one the graph can still be rendered
+        """
+        assert len(tf) != 0, "graph.Graph: timeframe is empty"
         self._a     = a
-        self._tf    = sorted(tf, key=lambda x: (x[0], x[1])) 
+        self._tf    = sorted(tf, key=lambda x: (x[0], x[1]))
+        self._prepare()
+        if window:
+            self._open(master)
+
 
+    def _open(self, master) -> None:
+        """Creates the Tk window and its canvas
+        """
+        assert tk is not None, "tkinter is not available to show a graph"
         self._t     = tk.Tk()
-                
+        self._t.title(self.title())
+        self._items     = list()        # Canvas items, in the order of shapes
+        self._layout    = list()        # (kind, options) of the items
+        self._pending   = None          # Redraw scheduled by the last resize
+
         self._canvas = tk.Canvas(master=self._t, height=1200, width=800)
         self._canvas.grid(row=0,column=0,sticky = tk.N + tk.S + tk.W + tk.E)
         self._canvas.bind('<Configure>', self._resize)
-        
+
         self._t.rowconfigure(0, weight = 1)
-        self._t.columnconfigure(0, weight = 1)    
+        self._t.columnconfigure(0, weight = 1)
+
 
-    
-    def reset(self) -> (int, int):
-        """Returns current width and height of canvas, and deletes 
-        all drawn material on canvas
+    def title(self) -> str:
+        """Returns title of the graph. Defined by subclasses
         """
-        self._canvas.delete(tk.ALL)
-        h = self._canvas.winfo_height()
-        w = self._canvas.winfo_width()
-        return h,w 
+        raise NotImplementedError
+
+
+    def series(self) -> {str: [int]}:
+        """Returns dictionary of series name to its values, one for each month
+        of the timeframe. Defined by subclasses
+        """
+        raise NotImplementedError
+
+
+    def fraction(self, v: int, largest: int) -> float:
+        """Returns height of value v, from 0 at the top of the plot to 1 at its
+        bottom. largest is the greatest value over all series
+        """
+        return 1 - (v/largest) if largest != 0 else 1
+
+
+    def y(self, f: float, h: int) -> float:
+        """Returns canvas y of a point at height fraction f on a canvas of
+        height h
+        """
+        return 10+(f*(h-10-20))
+
+
+    def color(self, name: str, v: int) -> str:
+        """Returns color of the point of value v of a series
+        """
+        raise NotImplementedError
+
+
+    def line_color(self, name: str, y0: float, y1: float) -> str:
+        """Returns color of the line of a series from canvas y0 to y1
+        """
+        return self.color(name, 0)
+
+
+    def largest(self, values: {str: [int]}) -> int:
+        return max(v for vs in values.values() for v in vs)
 
 
-    def draw_axes(self, h, w, order=0):
-        """Draws to canvas axes 
+    def _prepare(self) -> None:
+        """Reads the series of the Account once and keeps what a layout
+        needs: height fractions, value texts and colors
         """
-        if order == 0: 
-            pass 
-        elif order == 1: 
-            self._canvas.create_line(0, h-30, w, h-30)  # x axis
-            self._canvas.create_line(20, 0, 20, h)  # y-axis
-        elif order == 2: 
-            self._canvas.create_line(0, (h-40)/2, w, (h-40)/2) # x axis
-            self._canvas.create_line(20, 0, 20, h) # y-axis
+        values = self.series()
+        largest = self.largest(values)
+        self._fractions = {n: [self.fraction(v, largest) for v in vs] for n, vs in values.items()}
+        self._texts     = {n: ["{:.2f}".format(v/100) for v in vs] for n, vs in values.items()}
+        self._colors    = {n: [self.color(n, v) for v in vs] for n, vs in values.items()}
+        self._labels    = [months_abv(m)+"\n"+str(y+1) for y, m in self._tf]
+        self._samples   = dict()        # (series name, points) -> indices kept
+
+
+    def _sample(self, name: str, n: int) -> [int]:
+        """Returns indices of the months of a series drawn when n points fit,
+        downsampled from the full series once for each n
+        """
+        if (name, n) not in self._samples:
+            self._samples[(name, n)] = lttb(self._fractions[name], n)
+        return self._samples[(name, n)]
+
+
+    def _kept(self, w: int) -> {str: [int]}:
+        """Returns indices of the months of each series drawn in a width w
+        """
+        fit = max(2, int(w // point_px))                                        # Points that fit in the width
+        return {n: self._sample(n, fit) for n in self._fractions}
+
+
+    def shapes(self, h: int, w: int) -> [(str, tuple, dict)]:
+        """Returns (kind, coordinates, options) of every item of the graph on a
+        canvas of height h and width w, computed in one pass over the cached
+        series. kind is "line", "oval", "text" or "polygon". Each run of a
+        series in one color is one line. At most one point a point_px and one
+        label a label_px of width are drawn, and values are written only where
+        text_px apart
+        """
+        w_dist = w/len(self._tf)
+        kept = self._kept(w)
+        result = list()
+        for x0, y0, x1, y1 in self.axes(h, w):
+            result.append(("line", (x0, y0, x1, y1), {}))
+        points = dict()
+        for n, idx in kept.items():                                             # Connections
+            points[n] = [(w_dist*i + 25, self.y(self._fractions[n][i], h), i) for i in idx]
+            run, color = list(points[n][0][:2]), None
+            for (x0, y0, i0), (x1, y1, i1) in zip(points[n], points[n][1:]):
+                c = self.line_color(n, y0, y1)
+                if color is not None and c != color:
+                    result.append(("line", tuple(run), {"fill": color}))
+                    run = [x0, y0]
+                run += [x1, y1]
+                color = c
+            if color is not None:
+                result.append(("line", tuple(run), {"fill": color}))
+        step = max(1, -(-len(self._tf) * label_px // int(max(w, 1))))          # Every step-th month labelled
+        for i in range(0, len(self._tf), step):                                 # Labels on the x-axis
+            result.append(("text", (w_dist*i + 25, h - 15), {"text": self._labels[i], "font": standard_font}))
+        for n in (kept if self.points else ()):                                # Points and values
+            values = len(kept[n]) * text_px <= w
+            for x, y, i in points[n]:
+                color = self._colors[n][i]
+                result.append(("oval", (x - radius, y - radius, x + radius, y + radius),
+                               {"fill": color, "outline": color}))
+                if values:
+                    result.append(("text", (x - radius, y + 10),
+                                   {"text": self._texts[n][i], "font": standard_font, "fill": color}))
+        return result
+
+
+    def axes(self, h: int, w: int) -> [(float, float, float, float)]:
+        """Returns lines of the axes. None by default
+        """
+        return list()
+
+
+    def render(self, canvas, h: int, w: int, shapes=None) -> list:
+        """Draws the graph on canvas, of height h and width w, and returns its
+        items. canvas is a tk.Canvas or a backend of render with the same 
+        create_ methods. shapes are those of shapes(h, w), if already made
+        """
+        shapes = self.shapes(h, w) if shapes is None else shapes
+        return [getattr(canvas, "create_" + kind)(*coords, **options)
+                for kind, coords, options in shapes]
+
+
+    def _resize(self, event) -> None:
+        """Method that is called when canvas is resized. A burst of resizes,
+        as while dragging, is drawn once after the last of them
+        """
+        if self._pending is not None:
+            self._t.after_cancel(self._pending)
+        self._pending = self._t.after(debounce_ms, self._draw)
+
+
+    def _draw(self) -> None:
+        """Draws the graph to fit the current size of the canvas. Items already
+        on the canvas are moved rather than drawn again, unless the items
+        differ, as when the number of points or labels that fit changes
+        """
+        self._pending = None
+        h = self._canvas.winfo_height()
+        w = self._canvas.winfo_width()
+        shapes = self.shapes(h, w)
+        layout = [(kind, options) for kind, coords, options in shapes]
+        if layout != self._layout:                                              # Other items than those drawn
+            self._canvas.delete(tk.ALL)
+            self._items = self.render(self._canvas, h, w, shapes)
+            self._layout = layout
+            print("Graph Displayed")                                            # Confirmation
+        else:
+            for item, (kind, coords, options) in zip(self._items, shapes):
+                self._canvas.coords(item, *coords)
 
 
     def view(self):
         """Executes mainloop
         """
         self._t.mainloop()
-    
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+    from transaction        import Transaction
+    from account_graph_rate import AccountGraphRate
+
+    # Benchmark: 20 redraws of 30 years of months, laid out without opening a window
+    ts = [Transaction(1990 + i // 12, i % 12, 1, "Fast Food", "Cash", "Description", 100 + i)
+          for i in range(360)]
+    a = Account("Fast Food", 0, ts, {})
+    tf = sorted((y, m) for y in a.get_budgets() for m in a.get_budgets(y))
+
+    def layout_by_lookup(a, tf, h, w):
+        """Previous redraw: each point read from the Account and placed by
+        its index in the timeframe
+        """
+        w_dist = w/len(tf)
+        largest = max(a.get_reached(y,m) for (y,m) in tf)
+        coords = list()
+        for i in range(len(tf) - 1):
+            (y0, m0), (y1, m1) = tf[i], tf[i+1]
+            coords.append((w_dist * tf.index((y0,m0)) + 25, 10+((1 - a.get_reached(y0,m0)/largest)*(h-30)),
+                           w_dist * tf.index((y1,m1)) + 25, 10+((1 - a.get_reached(y1,m1)/largest)*(h-30))))
+        largest = max(a.get_reached(y,m) for (y,m) in tf)
+        for y,m in tf:
+            y_point = 10+((1 - a.get_reached(y,m)/largest)*(h-30))
+            coords.append((w_dist * tf.index((y,m)) + 25, h - 15))
+            coords.append((w_dist * tf.index((y,m)) + 25 - radius, y_point-radius,
+                           w_dist * tf.index((y,m)) + 25 + radius, y_point+radius))
+            coords.append((w_dist * tf.index((y,m)) + 25 - radius, y_point+10, a.get_reached(y,m)/100))
+        return coords
+
+    start = time.perf_counter()
+    for i in range(20):
+        layout_by_lookup(a, tf, 600 + i, 800 + i)
+    print("Lookup per point : {:.3f} s".format(time.perf_counter()-start))
+
+    start = time.perf_counter()
+    g = AccountGraphRate(a, tf, window=False)
+    for i in range(20):
+        g.shapes(600 + i, 800 + i)
+    print("Downsampled      : {:.3f} s, {} items".format(time.perf_counter()-start, len(g.shapes(600, 800))))
+    print("Items by width   :", [(w, len(g.shapes(600, w))) for w in (200, 800, 1600, 4000)])
+    print("Items by months  :", [(n, len(AccountGraphRate(a, tf[:n], window=False).shapes(600, 800)))
+                                 for n in (12, 60, 120, 360)])
+    print(lttb([0, 1, 0, 5, 0, 1, 0, -4, 0, 1], 5))
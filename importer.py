@@ -0,0 +1,198 @@
+# importer.py
+# Reads bank statements, CSV or OFX/QFX, into Transactions
+
+from transaction import Transaction
+from collections import namedtuple
+from datetime    import datetime
+from decimal     import Decimal, ROUND_HALF_UP
+import csv
+import re
+import valid
+
+Line    = namedtuple("Line", "lineno year month day description amount")
+# year, month, day:     zero based, as Transaction expects
+# amount:               signed integer cents; negative for money leaving the account
+
+Problem = namedtuple("Problem", "lineno error")
+
+# Statement field -> CSV column heading. Either amount, or debit and credit
+# (money out and money in, as unsigned columns), must be mapped
+csv_columns = {"date": "Date", "description": "Description", "amount": "Amount"}
+date_format = "%Y-%m-%d"
+
+_cent = Decimal("0.01")
+_amount = re.compile(r"(\(?)([+-]?)\$?([+-]?)((?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d*)?|\.\d+)(\)?)")
+# Parentheses, sign, dollar sign, sign, digits with optional thousands separators and cents, parentheses
+
+
+def cents(s: str) -> int:
+    """Returns integer cents of an amount such as "-1,234.5", "$12.00" or
+    "(3.25)", rounded half up. Parentheses mean a negative amount. Raises
+    ValueError for anything else
+    """
+    match = _amount.fullmatch("".join(s.split()))
+    if match is None or match.group(1) != ("(" if match.group(5) else "") or \
+            (match.group(2) and match.group(3)):
+        raise ValueError("{} is not an amount".format(repr(s.strip())))
+    opening, sign0, sign1, digits, closing = match.groups()
+    d = Decimal(sign0 + sign1 + digits.replace(",", ""))
+    d = d.quantize(_cent, rounding=ROUND_HALF_UP)
+    return int(d * 100) * (-1 if opening else 1)
+
+
+def _line(lineno: int, date: datetime, description: str, amount: int) -> Line:
+    """Returns Line of a statement line, checking its date as valid does.
+    Double quotes, which end a string of the data file, become single quotes
+    """
+    y, m, d = date.year - 1, date.month - 1, date.day - 1
+    valid.year(y); valid.month(m); valid.day(y, m, d)
+    if amount == 0:                                                             # Checked under python -O as well
+        raise ValueError("amount is zero")
+    return Line(lineno, y, m, d, " ".join(description.replace('"', "'").split()), amount)
+
+
+def read_csv(f: "iterable of str", columns=None, date_format=date_format, delimiter=",") -> "generator":
+    """Yields a Line, or a Problem, for each row of a CSV statement with a
+    heading row. columns maps statement fields to column headings, as
+    csv_columns does
+    """
+    columns = csv_columns if columns is None else columns
+    reader = csv.reader(f, delimiter=delimiter)
+    try:
+        heading = next(reader)
+    except StopIteration:
+        return
+    position = {h.strip(): i for i, h in enumerate(heading)}
+    missing = [c for c in columns.values() if c not in position]
+    if len(missing) != 0:
+        yield Problem(1, "columns {} not in heading".format(", ".join(missing)))
+        return
+    at = {field: position[c] for field, c in columns.items()}
+    assert "amount" in at or ("debit" in at and "credit" in at), \
+        "importer.read_csv: amount, or debit and credit, must be mapped"
+
+    for row in reader:
+        lineno = reader.line_num
+        if len(row) == 0 or all(c.strip() == "" for c in row):
+            continue
+        try:
+            date = datetime.strptime(row[at["date"]].strip(), date_format)
+            if "amount" in at:
+                amount = cents(row[at["amount"]])
+            else:
+                out, into = row[at["debit"]].strip(), row[at["credit"]].strip()
+                amount = (cents(into) if into != "" else 0) - (cents(out) if out != "" else 0)
+            yield _line(lineno, date, row[at["description"]], amount)
+        except Exception as e:
+            yield Problem(lineno, str(e) or type(e).__name__)
+
+
+_tag = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def read_ofx(f: "iterable of str") -> "generator":
+    """Yields a Line, or a Problem, for each STMTTRN of an OFX or QFX
+    statement. Both the SGML form, without closing tags, and the XML form
+    are read, one line at a time
+    """
+    fields = None                                                               # Of the open STMTTRN
+    for lineno, s in enumerate(f, 1):
+        for closing, tag, value in _tag.findall(s):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing == "":
+                    fields = {"lineno": lineno}
+                    continue
+                if fields is None:
+                    continue
+                try:
+                    date = datetime.strptime(fields["DTPOSTED"][:8], "%Y%m%d")
+                    description = fields.get("NAME") or fields.get("MEMO") or fields.get("PAYEE", "")
+                    yield _line(fields["lineno"], date, description, cents(fields["TRNAMT"]))
+                except KeyError as e:
+                    yield Problem(fields["lineno"], "{} missing".format(e.args[0]))
+                except Exception as e:
+                    yield Problem(fields["lineno"], str(e) or type(e).__name__)
+                fields = None
+            elif fields is not None and closing == "" and tag not in fields:
+                fields[tag] = value.strip()
+
+
+def read(filename: str, **options) -> ([Line], [Problem]):
+    """Returns Lines and Problems of a statement file, read as OFX if its name
+    ends in .ofx or .qfx and as CSV otherwise. options are passed to read_csv
+    """
+    with open(filename, newline="", encoding="utf-8-sig", errors="replace") as f:
+        if filename.lower().endswith((".ofx", ".qfx")):
+            rows = read_ofx(f)
+        else:
+            rows = read_csv(f, **options)
+        lines, problems = list(), list()
+        for r in rows:
+            (lines if type(r) == Line else problems).append(r)
+    return lines, problems
+
+
+def transactions(lines: [Line], account: str, counter: str) -> [Transaction]:
+    """Returns Transactions of statement lines of the Account account. Money
+    leaving it is debited to the Account counter, and money entering it is
+    credited to counter
+    """
+    return [Transaction(l.year, l.month, l.day, counter, account, l.description, -l.amount)
+            if l.amount < 0 else
+            Transaction(l.year, l.month, l.day, account, counter, l.description, l.amount)
+            for l in lines]
+
+
+# Testing
+if __name__ == "__main__":
+    import io, time
+
+    print(cents("-1,234.565"), cents("$12"), cents("(3.25)"), cents("0.1"), cents("-$ 5."), cents(".25"))
+    for s in ("1e5", "12.3.4", "1,23", "$", "(3.25", "+-1", "12 USD", ""):
+        try:
+            cents(s)
+            print("{} was read as an amount".format(repr(s)))
+        except ValueError as e:
+            print(e)
+    statement = io.StringIO(
+        "Date,Description,Amount\n"
+        "2015-12-24,WENDY'S   #123,-5.00\n"
+        "2015-12-25,Paycheck,\"1,200.00\"\n"
+        "2015-02-30,Bad date,-1.00\n"
+        "2015-12-26,Bad amount,abc\n")
+    for r in read_csv(statement):
+        print(r)
+    ofx = io.StringIO(
+        "OFXHEADER:100\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20151224120000[-5:EST]\n<TRNAMT>-5.00\n"
+        "<FITID>1\n<NAME>WENDY'S #123\n</STMTTRN>\n"
+        "<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20151225</DTPOSTED><TRNAMT>1200.00</TRNAMT>"
+        "<NAME>Paycheck</NAME></STMTTRN>\n"
+        "<STMTTRN><DTPOSTED>20151226<NAME>No amount</STMTTRN>\n"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+    lines = list(read_ofx(ofx))
+    for r in lines:
+        print(r)
+    print(transactions([l for l in lines if type(l) == Line], "Checking", "Uncategorized"))
+
+    # Benchmark: throughput of 100,000 statement lines
+    n = 100000
+    text = "Date,Description,Amount\n" + "".join(
+        "{}-{:02}-{:02},Purchase {},-{}.{:02}\n".format(2000 + i % 20, i % 12 + 1, i % 28 + 1, i % 997, i % 500 + 1, i % 100)
+        for i in range(n))
+    start = time.perf_counter()
+    lines = list(read_csv(io.StringIO(text)))
+    ts = transactions(lines, "Checking", "Uncategorized")
+    secs = time.perf_counter() - start
+    print("CSV : {:.3f} s, {:,.0f} lines/s".format(secs, n/secs))
+
+    text = "<OFX><BANKTRANLIST>\n" + "".join(
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>{}{:02}{:02}\n<TRNAMT>-{}.{:02}\n<FITID>{}\n<NAME>Purchase {}\n</STMTTRN>\n".format(
+            2000 + i % 20, i % 12 + 1, i % 28 + 1, i % 500 + 1, i % 100, i, i % 997)
+        for i in range(n)) + "</BANKTRANLIST></OFX>\n"
+    start = time.perf_counter()
+    lines = list(read_ofx(io.StringIO(text)))
+    ts = transactions(lines, "Checking", "Uncategorized")
+    secs = time.perf_counter() - start
+    print("OFX : {:.3f} s, {:,.0f} lines/s".format(secs, n/secs))
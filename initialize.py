@@ -1,23 +1,31 @@
 # open.py 
 # Opens file to import Accounts and Transactions
 
-from account import Account, Budget # Necessary to initialize Budget namedtuple
+from account import Account
 from transaction import Transaction
+from ledger_parser import parse_line
+from journal import Journal
+from save import AccountRow, BudgetRow, row_names
 
 def main(filename: str) -> ({str:None}, [Account], [Transaction]):
     """Returns a 3-tuple (Accounts, Transactions) after processing an opened file
     """
     acts = list(); ts = list(); var = dict()
+    act_rows = list(); budgets = dict()
     print("    Opening file")
     f = open(filename)
     print("    Retrieving Data")
-    for i in f:
+    for n, i in enumerate(f, 1):
         try:
-            e = eval(i) 
-            if type(e) == Account: 
-                acts.append(e)
-            elif type(e) == Transaction: 
+            e = parse_line(i, n, row_names)
+            if type(e) == Transaction:                                  # Transaction table
                 ts.append(e)
+            elif type(e) == AccountRow: 
+                act_rows.append(e)
+            elif type(e) == BudgetRow: 
+                budgets[e.name] = e.budgets
+            elif type(e) == Account:                                    # Data files written before 
+                acts.append(e)                                          # the Account table
             elif type(e) == dict: 
                 var = e
             else: continue 
@@ -25,10 +33,26 @@ def main(filename: str) -> ({str:None}, [Account], [Transaction]):
             print("    An error has occurred: {}".format(e))
     f.close()  
     print("    File closed")
-            
+
     # Add Transactions in Accounts, but only if the Transaction is not in 
     # the list of Transaction objects already 
-    ts = ts + [t for a in acts for t in a.get_ts() if t not in ts]
+    if len(acts) != 0: 
+        seen = set(ts)
+        for a in acts: 
+            for t in a.get_ts(): 
+                if t not in seen: 
+                    seen.add(t)
+                    ts.append(t)
+
+    # Accounts share the Transaction objects of the transaction table
+    for r in act_rows: 
+        try: 
+            acts.append(Account(r.name, r.kind, [ts[i] for i in r.ids], budgets.get(r.name, {})))
+        except Exception as e:
+            print("    An error has occurred: Account {}: {}".format(r.name, e))
+
+    # Apply changes made since the data file was last written
+    Journal(filename).replay(var, acts, ts)
     return var, acts, ts
 
 
@@ -0,0 +1,220 @@
+# journal.py
+# Append-only log of the changes made since the data file was last written
+
+from collections import namedtuple
+from transaction import Transaction
+from account     import Account
+from account_book import AccountBook
+import ledger_parser
+import save
+import changes
+import os
+
+# Records. Each is written as its repr on one line, so the journal follows the
+# same grammar as the data file and is read back by ledger_parser
+Add     = namedtuple("Add", "t")                        # Transaction entered
+Delete  = namedtuple("Delete", "t")                     # Transaction deleted
+Edit    = namedtuple("Edit", "before after")            # Transaction revised
+Goal    = namedtuple("Goal", "name year month goal")    # Account goal revised
+Name    = namedtuple("Name", "before after")            # Account renamed
+Kind    = namedtuple("Kind", "name kind")               # Account kind revised
+
+record_names = dict(
+    ledger_parser.constructors,
+    Add=Add, Delete=Delete, Edit=Edit, Goal=Goal, Name=Name, Kind=Kind)
+
+compact_every = 500     # Records appended before the journal is folded into the data file
+
+
+def journal_file(data_file: str) -> str:
+    """Returns name of the journal kept beside a data file
+    """
+    return data_file + ".journal"
+
+
+class Journal:
+    def __init__(self, data_file: str):
+        self._data_file = data_file
+        self._filename  = journal_file(data_file)
+        self._records   = 0
+        if os.path.isfile(self._filename):
+            with open(self._filename) as f:
+                self._records = sum(1 for line in f if line.strip())
+
+
+    def __len__(self):
+        """Returns number of records written since the last compaction
+        """
+        return self._records
+
+
+    def append(self, *records) -> None:
+        """Writes records to the end of the journal
+        """
+        if len(records) == 0:
+            return
+        with open(self._filename, "a") as f:
+            f.write("".join(repr(r) + "\n" for r in records))
+        self._records += len(records)
+
+
+    def replay(self, var, ats: [Account], ts: [Transaction]) -> None:
+        """Applies every record of the journal, in order, to the Accounts and
+        Transactions loaded from the data file. Transactions are found by
+        key, so each record takes constant time however long the ledger
+        """
+        if not os.path.isfile(self._filename):
+            return
+        book = AccountBook(ats)
+        by_key = dict()                                                         # key() -> [Transaction] of ts
+        for t in ts:
+            by_key.setdefault(t.key(), list()).append(t)
+        deleted = set()                                                         # id() of Transactions to drop from ts
+        edited = False
+        with open(self._filename) as f:
+            for n, r in ledger_parser.parse(f, record_names):
+                try:
+                    if type(r) == Add:
+                        _add(r.t, ts, book, by_key)
+                    elif type(r) == Delete:
+                        _delete(r.t, book, by_key, deleted)
+                    elif type(r) == Edit:
+                        _edit(r.before, r.after, book, by_key)
+                        edited = True
+                    elif type(r) == Goal:
+                        book[r.name].set_goal(r.year, r.month, r.goal)
+                    elif type(r) == Name:
+                        book[r.before].set_name(r.after)
+                    elif type(r) == Kind:
+                        book[r.name].set_kind(r.kind)
+                except Exception as e:
+                    print("    An error has occurred: line {} of {}: {}".format(
+                        n, self._filename, e))
+        if len(deleted) != 0:
+            ts[:] = [t for t in ts if id(t) not in deleted]
+        if edited:
+            for a in ats:
+                a.update_all_reached()
+
+
+    def compact(self, ts: [Transaction], ats: [Account], var) -> None:
+        """Writes the current session to the data file, empties the journal
+        and clears the record of changes
+        """
+        tmp = self._data_file + ".tmp"
+        save.main(ts, ats, var, tmp)
+        os.replace(tmp, self._data_file)
+        open(self._filename, "w").close()
+        self._records = 0
+        changes.clear()
+
+
+def _add(t: Transaction, ts: [Transaction], book: AccountBook, by_key: dict) -> None:
+    """Adds Transaction to the collection and to the Accounts it names.
+    A Transaction already present is skipped, so replaying a record twice is
+    harmless
+    """
+    if t.key() in by_key:
+        return
+    ts.append(t)
+    by_key[t.key()] = [t]
+    changes.mark(t)
+    book.add(t)
+
+
+def _named(t: Transaction, book: AccountBook) -> [Account]:
+    """Returns the Accounts named by a Transaction
+    """
+    names = (t.get_dr_account(), t.get_cr_account())
+    return [book[name] for name in sorted(set(names)) if name in book]
+
+
+def _delete(t: Transaction, book: AccountBook, by_key: dict, deleted: set) -> None:
+    """Removes Transaction from the Accounts it names and records it in
+    deleted, to be dropped from the collection once replay ends
+    """
+    for a in _named(t, book):
+        if t in a:
+            a.remove(t)
+    held = by_key.get(t.key())
+    if held is not None:
+        i = held.pop(0)
+        if len(held) == 0:
+            del by_key[t.key()]
+        deleted.add(id(i))
+        changes.mark_removed(i)
+
+
+def _revise(i: Transaction, after: Transaction) -> None:
+    i.set_year(after.get_year())
+    i.set_month(after.get_month())
+    i.set_day(after.get_day())
+    i.set_dr_account(after.get_dr_account())
+    i.set_cr_account(after.get_cr_account())
+    i.set_description(after.get_description())
+    i.set_currency(after.get_currency())
+    i.set_amount(after.get_amount())
+
+
+def _edit(before: Transaction, after: Transaction, book: AccountBook, by_key: dict) -> None:
+    """Revises every stored copy of before to hold the values of after: those
+    of the collection, and copies of their own in the Accounts before names
+    """
+    if before.key() == after.key():
+        return
+    accounts = _named(before, book)
+    for i in by_key.pop(before.key(), list()):
+        _revise(i, after)
+        by_key.setdefault(i.key(), list()).append(i)
+    for a in accounts:
+        i = a.find(before)
+        while i is not None:                                                    # Copies not shared with the collection
+            _revise(i, after)
+            i = a.find(before)
+
+
+# Testing
+if __name__ == "__main__":
+    t0 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t1 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t2 = Transaction(2015, 10, 22, "Drinks", "Savings", "Coffee", 200)
+    ts  = [t0, t1]
+    ats = [Account("Fast Food", 1, [t0, t1], {}), Account("Cash", 2, [t0, t1], {})]
+    save.main(ts, ats, {}, "test.txt")
+
+    jn = Journal("test.txt")
+    t1_new = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 700)
+    jn.append(Add(t2), Edit(t1, t1_new), Goal("Fast Food", 2015, 11, -1000), Kind("Drinks", 1))
+    print(len(jn), "records")
+
+    import initialize
+    var, ats, ts = initialize.main("test.txt")
+    for a in ats:
+        print(a)
+    jn.compact(ts, ats, var)
+    print(len(jn), "records after compaction")
+
+    # Benchmark: replay of a full journal of adds, edits and deletes over 100,000 Transactions
+    import time
+    ts = [Transaction(2000 + i // 12000, (i // 1000) % 12, i % 28, "Fast Food", "Cash", "Purchase {}".format(i), 100 + i)
+          for i in range(100000)]
+    ats = [Account("Fast Food", 1, list(ts), {}), Account("Cash", 2, list(ts), {})]
+    save.main(ts, ats, {}, "test.txt")
+    if os.path.isfile(journal_file("test.txt")):
+        os.remove(journal_file("test.txt"))
+    start = time.perf_counter()
+    initialize.main("test.txt")
+    loaded = time.perf_counter() - start
+    jn = Journal("test.txt")
+    records = list()
+    for i in range(100000 - 166*300, 100000, 300):
+        records.append(Add(Transaction(2015, 0, 1, "Fast Food", "Cash", "New {}".format(i), i)))
+        records.append(Edit(ts[i], Transaction(2015, 0, 2, "Fast Food", "Cash", "Edited {}".format(i), i)))
+        records.append(Delete(ts[i+1]))
+    jn.append(*records)
+    start = time.perf_counter()
+    var, ats, ts = initialize.main("test.txt")
+    print("Load of 100,000 Transactions: {:.3f} s, with replay of {} records: {:.3f} s, {} Transactions".format(
+        loaded, len(records), time.perf_counter()-start, len(ts)))
+    os.remove(journal_file("test.txt"))
+    os.remove("test.txt")
@@ -0,0 +1,222 @@
+# ledger_parser.py
+# Parses the lines written by save.main without compiling them
+
+import re
+from ast         import literal_eval
+from transaction import Transaction
+from account     import Account, Budget
+
+# Grammar of a data file line, as produced by the reprs of the objects save.main
+# writes:
+#     value   : call | list | dict | string | number | True | False | None
+#     call    : NAME "(" [arg ("," arg)*] ")"      arg: value | NAME "=" value
+#     list    : "[" [value ("," value)*] "]"
+#     dict    : "{" [value ":" value ("," value ":" value)*] "}"
+# Only the names in constructors may be called. Nothing is ever compiled or
+# evaluated, so a corrupted line can only fail to parse.
+
+constructors = {
+    "Transaction": Transaction,
+    "Account": Account,
+    "Budget": Budget}
+
+_literals = {"True": True, "False": False, "None": None}
+
+_ws     = re.compile(r"\s*")
+_num    = re.compile(r"-?\d+(\.\d*)?([eE][-+]?\d+)?")
+_str    = re.compile(r'"[^"\n]*"|\'(?:[^\'\\\n]|\\.)*\'')
+_name   = re.compile(r"[A-Za-z_]\w*")
+
+# Fast path for lists of integers, such as the Transaction IDs of an Account
+_ints   = re.compile(r"\[\s*(-?\d+\s*(,\s*-?\d+\s*)*)?\]")
+
+# Fast path for the exact layout of Transaction.__repr__, which accounts for
+# almost every value in a data file
+_transaction = re.compile(
+    r'Transaction\((-?\d+), (-?\d+), (-?\d+), "([^"\n]*)", "([^"\n]*)", '
+    r'"([^"\n]*)", (-?\d+), \'([^\'\\\n]*)\'\)')
+
+
+class LedgerParseError(ValueError):
+    """Raised when a line of a data file does not follow the ledger grammar
+    """
+    def __init__(self, lineno: int, col: int, msg: str):
+        ValueError.__init__(self, "line {}, column {}: {}".format(lineno, col+1, msg))
+        self.lineno = lineno
+        self.col    = col
+
+
+def parse_line(line: str, lineno=0, names=constructors) -> object:
+    """Returns the object represented by one line of a data file. Returns None
+    for a blank line
+    """
+    i = _ws.match(line).end()
+    if i == len(line):
+        return None
+    try:
+        v, i = _value(line, i, names)
+    except LedgerParseError as e:
+        raise LedgerParseError(lineno, e.col, str(e).split(": ", 1)[1])
+    except (AssertionError, TypeError, ValueError) as e:               # Raised by constructors
+        raise LedgerParseError(lineno, i, "invalid value: {}".format(e))
+    i = _ws.match(line, i).end()
+    if i != len(line):
+        raise LedgerParseError(lineno, i, "unexpected {!r}".format(line[i:i+10]))
+    return v
+
+
+def parse(f: "iterable of str", names=constructors) -> "generator":
+    """Yields (line number, object) for every non-blank line of f. Lines are
+    numbered from 1
+    """
+    for n, line in enumerate(f, 1):
+        v = parse_line(line, n, names)
+        if v is not None:
+            yield n, v
+
+
+def _expect(s: str, i: int, c: str) -> int:
+    """Returns position after character c at or after position i, skipping
+    whitespace
+    """
+    i = _ws.match(s, i).end()
+    if s[i:i+1] != c:
+        raise LedgerParseError(0, i, "expected {!r} but found {!r}".format(c, s[i:i+10]))
+    return i + 1
+
+
+def _value(s: str, i: int, names: dict) -> (object, int):
+    """Returns 2-tuple of the value starting at position i and the position
+    after it
+    """
+    i = _ws.match(s, i).end()
+    c = s[i:i+1]
+    if c == "T":
+        m = _transaction.match(s, i)
+        if m:
+            y, mo, d, dr, cr, e, a, cur = m.groups()
+            return Transaction(int(y), int(mo), int(d), dr, cr, e, int(a), cur), m.end()
+    if c == "-" or c.isdigit():
+        m = _num.match(s, i)
+        if m:
+            t = m.group()
+            return (float(t) if m.group(1) or m.group(2) else int(t)), m.end()
+    elif c in ('"', "'"):
+        m = _str.match(s, i)
+        if m:
+            t = m.group()
+            return (literal_eval(t) if "\\" in t else t[1:-1]), m.end()
+    elif c == "[":
+        m = _ints.match(s, i)
+        if m:
+            return ([int(v) for v in m.group(1).split(",")] if m.group(1) else []), m.end()
+        return _sequence(s, i+1, "]", names)
+    elif c == "{":
+        return _dict(s, i+1, names)
+    else:
+        m = _name.match(s, i)
+        if m:
+            n = m.group()
+            if n in _literals:
+                return _literals[n], m.end()
+            if n in names:
+                return _call(s, m.end(), names[n], names)
+            raise LedgerParseError(0, i, "unknown name {!r}".format(n))
+    raise LedgerParseError(0, i, "unexpected {!r}".format(s[i:i+10]))
+
+
+def _sequence(s: str, i: int, end: str, names: dict) -> ([object], int):
+    """Returns 2-tuple of the values up to the closing character end and the
+    position after it
+    """
+    l = list()
+    i = _ws.match(s, i).end()
+    if s[i:i+1] == end:
+        return l, i+1
+    while True:
+        v, i = _value(s, i, names)
+        l.append(v)
+        i = _ws.match(s, i).end()
+        if s[i:i+1] == ",":
+            i += 1
+        else:
+            return l, _expect(s, i, end)
+
+
+def _dict(s: str, i: int, names: dict) -> (dict, int):
+    """Returns 2-tuple of the dictionary whose opening brace precedes position
+    i and the position after it
+    """
+    d = dict()
+    i = _ws.match(s, i).end()
+    if s[i:i+1] == "}":
+        return d, i+1
+    while True:
+        k, i = _value(s, i, names)
+        v, i = _value(s, _expect(s, i, ":"), names)
+        d[k] = v
+        i = _ws.match(s, i).end()
+        if s[i:i+1] == ",":
+            i += 1
+        else:
+            return d, _expect(s, i, "}")
+
+
+def _call(s: str, i: int, f: "callable", names: dict) -> (object, int):
+    """Returns 2-tuple of the object constructed by f from the argument list
+    starting at position i and the position after it
+    """
+    args = list(); kwargs = dict()
+    i = _expect(s, i, "(")
+    i = _ws.match(s, i).end()
+    if s[i:i+1] == ")":
+        return f(), i+1
+    while True:
+        m = _name.match(s, i)
+        j = _ws.match(s, m.end()).end() if m else i
+        if m and s[j:j+1] == "=":
+            v, i = _value(s, j+1, names)
+            kwargs[m.group()] = v
+        else:
+            v, i = _value(s, i, names)
+            args.append(v)
+        i = _ws.match(s, i).end()
+        if s[i:i+1] == ",":
+            i = _ws.match(s, i+1).end()
+        else:
+            return f(*args, **kwargs), _expect(s, i, ")")
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+
+    print(parse_line('Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald\'s", 300, \'$\')'))
+    print(parse_line(
+        "Account('Cash',2,[Transaction(2015, 10, 24, \"Fast Food\", \"Cash\", \"Wendy's\", 500, '$')],"
+        "{2015: {10: Budget(goal=-500, reached=-500, ts_amt=1)}})"))
+    print(parse_line("{'user': 1}"))
+    try:
+        parse_line("__import__('os').system('echo unsafe')", 7)
+    except LedgerParseError as e:
+        print("Rejected:", e)
+
+    # Benchmark: load throughput against the eval path
+    n = 200000
+    ts = [Transaction(2000 + i % 20, i % 12, i % 28, "Account {}".format(i % 50),
+                      "Cash", "Description {}".format(i % 997), i) for i in range(n)]
+    lines = [repr(t) for t in ts]
+    lines += [repr(Account("Account {}".format(i), 0, ts[i:n:500], {})) for i in range(50)]
+
+    start = time.perf_counter()
+    evaluated = [eval(l) for l in lines]
+    eval_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = [v for _, v in parse(lines)]
+    parse_secs = time.perf_counter() - start
+
+    assert [repr(v) for v in evaluated] == [repr(v) for v in parsed]
+    print("{} lines".format(len(lines)))
+    print("eval  : {:>12,.0f} lines/sec".format(len(lines)/eval_secs))
+    print("parse : {:>12,.0f} lines/sec".format(len(lines)/parse_secs))
@@ -4,17 +4,22 @@
 import trans_entry
 import trans_view
 import trans_edit
-import account_init
+import account_book
+import time_index
+import text_index
+import cube
 import account_edit 
 import account_view
 import account_analysis
 import initialize
-import save 
+import journal
+import changes
+import sqlite_store
 import basecui as bc
 import os 
 
 # Initialiation of variables 
-data_file_str="data.txt"
+data_file_str="data.txt"                # Name ending in .db selects the SQLite backend
 menu = """
 MAIN MENU
 ========================================
@@ -27,46 +32,94 @@ MAIN MENU
     [esc]    : Exit menu
 """
 
-# Script
-# Ensure file exists
-if not os.path.isfile(data_file_str): 
-    data_file = open(data_file_str, "w")
-    data_file.close()  
-variables, accounts, transactions_dirty=initialize.main(data_file_str)
-transactions = bc.remove_duplicates(transactions_dirty) # Remove impure Transactions (duplicates)
+def load(filename: str) -> (sqlite_store.SQLiteStore, journal.Journal, {str: None}, 
+                            ["Account"], ["Transaction"]):
+    """Returns (store, journal, variables, Accounts, Transactions) of a data 
+    file. Exactly one of store and journal is None, as the file is a SQLite 
+    database or a text data file. A missing text data file is created
+    """
+    if sqlite_store.is_database(filename): 
+        store = sqlite_store.SQLiteStore(filename)
+        variables, accounts, transactions_dirty=store.load()
+        jn = None
+    else: 
+        # Ensure file exists
+        if not os.path.isfile(filename): 
+            data_file = open(filename, "w")
+            data_file.close()  
+        store = None
+        variables, accounts, transactions_dirty=initialize.main(filename)
+        jn = journal.Journal(filename)
+    transactions = bc.remove_duplicates(transactions_dirty) # Remove impure Transactions (duplicates)
+    return store, jn, variables, accounts, transactions
 
-# Menu looping 
-while True: 
-    print(menu)
-    try: 
-        choice = input("Your choice: ").rstrip()
-        if choice == "ntr":
-            transactions += trans_entry.main()
-            # Add data to Account objects
-            accounts_t=(account_init.create_from(transactions))
-            # Account for duplicate Accounts created from Transactions 
-            accounts=account_init.merge_accounts(accounts_t + accounts)
-        elif choice == "edt":
-            trans_edit.main(transactions, accounts)
-            # Many Accounts may be updated
-            for a in accounts: 
-                a.update_all_reached()
-        elif choice == "vts":
-            trans_view.main(transactions)
-        elif choice == "eda":
-            account_edit.main(accounts)
-        elif choice == "vwa":
-            account_view.main(accounts)
-        elif choice == "ana":
-            account_analysis.main(accounts)
-        elif choice == "esc":
-            break
-        else:
-            raise ValueError("Choice {} unacceptable. Try again.".format(choice))
-    except ValueError as e:
-        print("    An error has occurred: {}".format(e))
-    except Exception as e:
-        raise 
-        print("    Fatal Error: {}".format(e)) 
-    finally: 
-        save.main(transactions, accounts, variables, data_file_str)
+
+def close(store, jn, variables, accounts, transactions) -> None:
+    """Ends a session: writes the data file only if the ledger changed during 
+    the session
+    """
+    if store is not None: 
+        store.close()
+    elif changes.is_dirty() or len(jn) != 0:
+        jn.compact(transactions, accounts, variables)
+
+
+def main(filename=data_file_str) -> None:
+    """Runs the Main Menu over a data file until the user exits
+    """
+    store, jn, variables, accounts, transactions = load(filename)
+    book = account_book.AccountBook(accounts)               # Shares the list accounts
+    analysis_cube = cube.Cube(accounts)                     # Refreshed on each visit to the analysis menu
+    index = time_index.TimeIndex(transactions)              # Follows edits and deletions itself; built when first used
+    text = text_index.TextIndex(transactions)               # Likewise; built at the first search
+
+    # Menu looping 
+    while True: 
+        print(menu)
+        try: 
+            choice = input("Your choice: ").rstrip()
+            if choice == "ntr":
+                new_transactions = trans_entry.main()
+                transactions += new_transactions
+                if jn is not None: 
+                    jn.append(*(journal.Add(t) for t in new_transactions))
+                # Add only the new Transactions to the Accounts they name
+                book.add_all(new_transactions)
+                index.add_all(new_transactions)
+                text.add_all(new_transactions)
+            elif choice == "edt":
+                trans_edit.main(transactions, accounts, jn, index)
+                # Many Accounts may be updated
+                for a in accounts: 
+                    a.update_all_reached()
+            elif choice == "vts":
+                trans_view.main(transactions, store, index, text)
+            elif choice == "eda":
+                account_edit.main(accounts, jn)
+            elif choice == "vwa":
+                account_view.main(accounts, store)
+            elif choice == "ana":
+                account_analysis.main(accounts, store, analysis_cube)
+            elif choice == "esc":
+                break
+            else:
+                raise ValueError("Choice {} unacceptable. Try again.".format(choice))
+        except ValueError as e:
+            print("    An error has occurred: {}".format(e))
+        except Exception as e:
+            raise 
+            print("    Fatal Error: {}".format(e)) 
+        finally: 
+            if store is not None: 
+                # One database transaction per menu action, holding only what changed
+                if changes.is_dirty(): 
+                    store.write_changes(transactions, accounts, variables)
+            elif len(jn) >= journal.compact_every:
+                # Fold the journal into the data file once it grows long
+                jn.compact(transactions, accounts, variables)
+
+    close(store, jn, variables, accounts, transactions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# memo.py
+# Cache of results computed from one Account, dropped when the Account changes
+
+from collections import OrderedDict, namedtuple
+import functools
+
+Stats = namedtuple("Stats", "hits misses size capacity")
+
+
+class Memo:
+    def __init__(self, capacity=256):
+        """Initializes Memo holding at most capacity results. The least
+        recently used result is evicted first
+        """
+        self._entries   = OrderedDict()     # (function, id() of Account, arguments) -> (Account, generation, result)
+        self._capacity  = capacity
+        self._hits      = 0
+        self._misses    = 0
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def get(self, f: "callable", a: "Account", *args) -> object:
+        """Returns f(a, *args). A result kept from an earlier call is returned
+        if Account a has not changed since, as told by its generation
+        """
+        key = (f, id(a), args)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is a and entry[1] == a.get_gen():
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[2]
+
+        self._misses += 1
+        result = f(a, *args)
+        self._entries[key] = (a, a.get_gen(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+        return result
+
+
+    def stats(self) -> Stats:
+        return Stats(self._hits, self._misses, len(self._entries), self._capacity)
+
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hits = self._misses = 0
+
+
+cache = Memo()          # Shared by the functions decorated with memoized
+
+
+def memoized(f: "callable") -> "callable":
+    """Returns f with its results kept in cache. The first argument of f must
+    be an Account, and the rest must be hashable. Results are shared with the
+    caller, so they must not be mutated
+    """
+    @functools.wraps(f)
+    def cached_f(a, *args):
+        return cache.get(f, a, *args)
+    return cached_f
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+    from account     import Account
+    from transaction import Transaction
+
+    @memoized
+    def total(a: Account, tf: (int, int)) -> int:
+        return sum(t.get_amount() for t in a.get_ts() if (t.get_year(), t.get_month()) <= tf)
+
+    t0 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    a = Account("Fast Food", 0, [t0], {})
+    print(total(a, (2015, 11)), total(a, (2015, 11)))
+    a.add(Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300))
+    print(total(a, (2015, 11)))
+    t0.set_amount(700)                                          # Edits count as changes to a
+    print(total(a, (2015, 11)), cache.stats())
+
+    # Benchmark: flipping between two views of one Account of 100,000 Transactions
+    a = Account("Fast Food", 0, [Transaction(2000 + i % 20, i % 12, i % 28, "Fast Food", "Cash",
+                                             "Description", i) for i in range(100000)], {})
+    start = time.perf_counter()
+    for i in range(20):
+        total.__wrapped__(a, (2010, i % 2))
+    print("Uncached : {:.3f} s".format(time.perf_counter()-start))
+    start = time.perf_counter()
+    for i in range(20):
+        total(a, (2010, i % 2))
+    print("Cached   : {:.3f} s".format(time.perf_counter()-start), cache.stats())
@@ -0,0 +1,148 @@
+# pager.py
+# Shows rows rendered lazily, written in chunks or a page at a time
+
+import sys
+
+page_rows   = 20            # Rows per page; 0 writes every row without paging
+chunk_rows  = 256           # Rows joined into one write when not paging
+
+commands = "[n]ext, [p]revious, [j]ump to page number, [q]uit"
+
+
+def write(rows: "iterable", out=None, chunk=None) -> int:
+    """Writes rows, one per line, joining up to chunk rows into one write to
+    out (sys.stdout if not given). The first row is written alone, so that it
+    shows before the rest are rendered. Returns number of rows written
+    """
+    out = sys.stdout if out is None else out
+    chunk = chunk_rows if chunk is None else chunk
+    buffer = list()
+    n = 0
+    for row in rows:
+        buffer.append(row)
+        n += 1
+        if n == 1 or len(buffer) == chunk:
+            out.write("\n".join(buffer) + "\n")
+            out.flush()
+            buffer.clear()
+    if len(buffer) != 0:
+        out.write("\n".join(buffer) + "\n")
+        out.flush()
+    return n
+
+
+class Pager:
+    def __init__(self, rows: "iterable", size=None):
+        """Initializes Pager over rows of size rows a page. Rows are rendered
+        when their page is first shown and kept for going back
+        """
+        self._rows  = iter(rows)
+        self._seen  = list()        # Rows rendered so far
+        self._done  = False         # Whether rows are exhausted
+        self._size  = page_rows if size is None else size
+        assert self._size > 0, "Page size must be positive"
+
+
+    def _pull(self, n: int) -> None:
+        """Renders rows until n are kept or rows are exhausted
+        """
+        while not self._done and len(self._seen) < n:
+            try:
+                self._seen.append(next(self._rows))
+            except StopIteration:
+                self._done = True
+
+
+    def page(self, i: int) -> [str]:
+        """Returns rows of page i, counted from 0. Empty past the last page
+        """
+        self._pull((i+1)*self._size + 1)                                        # One more tells if page i is the last
+        return self._seen[i*self._size:(i+1)*self._size]
+
+
+    def is_last(self, i: int) -> bool:
+        self._pull((i+1)*self._size + 1)
+        return len(self._seen) <= (i+1)*self._size
+
+
+    def view(self, head="", out=None) -> None:
+        """Shows pages one at a time under head, as the user moves between
+        them
+        """
+        out = sys.stdout if out is None else out
+        i = 0
+        while True:
+            rows = self.page(i)
+            last = self.is_last(i)
+            out.write((head + "\n" if head != "" else "") + "\n".join(rows) + "\n")
+            out.flush()
+            if last and i == 0:                                                 # Fits on one page
+                return
+            out.write("Page {}{}\n".format(i+1, " (last)" if last else ""))
+            choice = input(commands + ": ").rstrip().lower()
+            try:
+                if choice in ("n", ""):
+                    assert not last, "Already on the last page"
+                    i += 1
+                elif choice == "p":
+                    assert i != 0, "Already on the first page"
+                    i -= 1
+                elif choice.startswith("j"):
+                    j = int(choice[1:] if choice[1:].strip() != "" else input("Page number: ")) - 1
+                    assert j >= 0 and len(self.page(j)) != 0, "Page {} does not exist".format(j+1)
+                    i = j
+                elif choice == "q":
+                    return
+                else:
+                    raise ValueError("Choice {} is not acceptable".format(choice))
+            except Exception as e:
+                print("    An error has occurred: {}".format(e))
+
+
+def show(head: str, rows: "iterable", out=None) -> None:
+    """Shows rows under head: written at once if they fit on a page or
+    paging is off, and otherwise through a Pager
+    """
+    out = sys.stdout if out is None else out
+    if page_rows == 0:
+        out.write(head + "\n")
+        write(rows, out)
+        return
+    Pager(rows).view(head, out)
+
+
+# Testing
+if __name__ == "__main__":
+    import io, time
+    from transaction import Transaction
+    from trans_view  import view, header
+
+    ts = [Transaction(2015, i % 12, i % 28, "Fast Food", "Cash", "Wendy's", 100 + i) for i in range(45)]
+    p = Pager((view(t, n) for n, t in enumerate(ts, 1)), 20)
+    print(len(p.page(0)), len(p.page(2)), p.is_last(1), p.is_last(2), len(p.page(3)))
+    print(write(("row {}".format(i) for i in range(3))))
+
+    # Benchmark: time to the first row, of 5,000 Transactions numbered by index and 200,000 streamed
+    ts = [Transaction(2000 + i % 20, i % 12, i % 28, "Fast Food", "Cash", "Wendy's", i) for i in range(200000)]
+
+    class _First(io.StringIO):
+        """Keeps the time of the first write
+        """
+        def write(self, s):
+            if not hasattr(self, "first"):
+                self.first = time.perf_counter()
+            return super().write(s)
+
+    start = time.perf_counter()
+    "\n".join(view(t, ts.index(t)+1) for t in ts[:5000])
+    print("Whole string, 5,000 rows  : {:.3f} s to the first row".format(time.perf_counter()-start))
+
+    out = _First()
+    start = time.perf_counter()
+    write((view(t, n) for n, t in enumerate(ts, 1)), out)
+    print("Streamed, 200,000 rows    : {:.6f} s to the first row, {:.3f} s in all".format(
+        out.first-start, time.perf_counter()-start))
+
+    start = time.perf_counter()
+    Pager(view(t, n) for n, t in enumerate(ts, 1)).page(0)
+    print("Paged, 200,000 rows       : {:.6f} s to the first page".format(time.perf_counter()-start))
@@ -0,0 +1,180 @@
+# reconcile.py
+# Matches imported Transactions to those already in the ledger
+
+from transaction import Transaction
+from collections import namedtuple
+from datetime    import date
+from difflib     import SequenceMatcher
+import re
+
+Reconciliation = namedtuple("Reconciliation", "matched new conflicts")
+# matched:      [(imported Transaction, ledger Transaction)], taken as the same
+# new:          [imported Transaction] with no ledger Transaction of its Account, side and
+#               amount near its date
+# conflicts:    [(imported Transaction, [ledger Transaction])], with ledger Transactions of
+#               its Account, side and amount near its date, none of which is clearly the same
+
+window      = 3         # Days apart that Transactions of the same amount may be
+similar     = 0.6       # Ratio of description similarity taken as a match
+
+
+def _ordinal(t: Transaction) -> int:
+    return date(t.get_year()+1, t.get_month()+1, t.get_day()+1).toordinal()
+
+
+def _words(s: str) -> str:
+    """Returns s lowercase, with runs of other than letters and digits as
+    one space, for comparing descriptions
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", s.lower().replace("'", "")))
+
+
+def similarity(s0: str, s1: str) -> float:
+    """Returns ratio, from 0 to 1, of how alike two descriptions are
+    """
+    return SequenceMatcher(None, _words(s0), _words(s1)).ratio()
+
+
+class LedgerIndex:
+    def __init__(self, ts: [Transaction], account: str):
+        """Initializes LedgerIndex of the Transactions of ts naming Account
+        account, by (side, date, amount), the key of the join. The side is
+        the flow of the money, into or out of the Account
+        """
+        self._account = account
+        self._buckets = dict()      # (flow, day ordinal, amount) -> [Transaction]
+        for t in ts:
+            if account in (t.get_dr_account(), t.get_cr_account()):
+                self._buckets.setdefault((t.flow(account), _ordinal(t), t.get_amount()), list()).append(t)
+
+
+    def near(self, t: Transaction, days: int) -> [(int, Transaction)]:
+        """Returns (days apart, Transaction) of the Transactions moving the
+        amount of t the same way through the Account, dated within days of
+        it, nearest first
+        """
+        side, o, amount = t.flow(self._account), _ordinal(t), t.get_amount()
+        result = list()
+        for k in sorted(range(-days, days+1), key=abs):
+            for t1 in self._buckets.get((side, o + k, amount), ()):
+                result.append((abs(k), t1))
+        return result
+
+
+def reconcile(imported: [Transaction], ts: [Transaction], account: str, days=None, ratio=None) -> Reconciliation:
+    """Returns Reconciliation of imported Transactions of the statement of
+    Account account against the ledger Transactions ts. An imported 
+    Transaction matches the nearest ledger Transaction of the Account moving
+    its amount the same way within days of it that is equal to it or has a
+    description at least ratio alike. Each ledger Transaction is matched at
+    most once
+    """
+    days = window if days is None else days
+    ratio = similar if ratio is None else ratio
+    index = LedgerIndex(ts, account)
+    claimed = set()                                         # id() of ledger Transactions matched
+    matched, new, conflicts = list(), list(), list()
+    for t in imported:
+        candidates = [(k, t1) for k, t1 in index.near(t, days) if id(t1) not in claimed]
+        if len(candidates) == 0:
+            new.append(t)
+            continue
+        best = None
+        for k, t1 in candidates:
+            if t1 == t or similarity(t.get_description(), t1.get_description()) >= ratio:
+                best = t1
+                break
+        if best is not None:
+            claimed.add(id(best))
+            matched.append((t, best))
+        else:
+            conflicts.append((t, [t1 for k, t1 in candidates]))
+    return Reconciliation(matched, new, conflicts)
+
+
+def _numbers(s: str, n: int) -> [int]:
+    """Returns zero-based numbers of an answer such as "1 3-5", "a" for all
+    or "" for none, of n choices
+    """
+    s = s.strip().lower()
+    if s in ("a", "all"):
+        return list(range(n))
+    chosen = set()
+    for part in s.replace(",", " ").split():
+        lo, _, hi = part.partition("-")
+        lo, hi = int(lo), int(hi) if hi != "" else int(lo)
+        assert 1 <= lo <= hi <= n, "{} not in range 1 to {}".format(part, n)
+        chosen.update(range(lo-1, hi))
+    return sorted(chosen)
+
+
+def confirm(conflicts: [(Transaction, [Transaction])]) -> [Transaction]:
+    """Shows every conflict on one screen beside the ledger Transactions it
+    may be, and returns the imported Transactions the user chooses to add
+    """
+    from trans_view import view, header
+    if len(conflicts) == 0:
+        return list()
+    print("\nImported Transactions that may already be in the ledger")
+    print(header(True))
+    for n, (t, candidates) in enumerate(conflicts, 1):
+        print(view(t, n))
+        for t1 in candidates[:3]:
+            print("     may be: {:>4} {:>2} {:>2} {}".format(
+                t1.get_year()+1, t1.get_month()+1, t1.get_day()+1, t1.get_description()))
+    while True:
+        try:
+            chosen = _numbers(input("Numbers to add as new (e.g. 1 3-5), [a]ll, or none: "), len(conflicts))
+        except Exception as e:
+            print("    An error has occurred: {}".format(e))
+        else:
+            return [conflicts[i][0] for i in chosen]
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+
+    ts = [Transaction(2015, 11, 24, "Fast Food", "Checking", "Wendy's", 500),
+          Transaction(2015, 11, 20, "Uncategorized", "Checking", "Coffee Bean", 350),
+          Transaction(2015, 11, 22, "Uncategorized", "Checking", "Shell Oil 1234", 4000),
+          Transaction(2015, 11, 23, "Uncategorized", "Checking", "Toll Road", 4000)]
+    imported = [Transaction(2015, 11, 24, "Fast Food", "Checking", "Wendy's", 500),          # Equal
+                Transaction(2015, 11, 20, "Uncategorized", "Checking", "COFFEE BEAN #12", 350),  # Alike
+                Transaction(2015, 11, 24, "Uncategorized", "Checking", "SHELL OIL", 4000),   # Two days apart, alike
+                Transaction(2015, 11, 24, "Uncategorized", "Checking", "Parking", 4000),     # Conflict: not alike
+                Transaction(2015, 11, 25, "Uncategorized", "Checking", "Paycheck", 120000)]  # New
+    r = reconcile(imported, ts, "Checking")
+    print(len(r.matched), r.new, r.conflicts)
+
+    # Testing Transactions of other Accounts, or the other way, alike in date and amount
+    ts = [Transaction(2015, 11, 24, "Fast Food", "Cash", "Wendy's", 500),                    # Paid in cash
+          Transaction(2015, 11, 24, "Checking", "Savings", "Transfer", 500)]                 # Into Checking
+    imported = [Transaction(2015, 11, 24, "Fast Food", "Checking", "Wendy's", 500)]          # Out of Checking
+    r = reconcile(imported, ts, "Checking")
+    print(len(r.matched), len(r.new), len(r.conflicts))
+    print(_numbers("1 3-4", 5), _numbers("a", 2), _numbers("", 2))
+
+    # Benchmark: 20,000 imported against 100,000 ledger Transactions
+    def reconcile_by_scan(imported, ts, days):
+        """Each imported Transaction compared with every ledger Transaction
+        """
+        return [[t1 for t1 in ts if t1.get_amount() == t.get_amount() and
+                 abs(_ordinal(t1) - _ordinal(t)) <= days] for t in imported]
+
+    ts = [Transaction(2000 + i % 20, i % 12, i % 28, "Uncategorized", "Checking", "Shop {}".format(i), 100 + i % 9973)
+          for i in range(100000)]
+    imported = [Transaction(t.get_year(), t.get_month(), t.get_day(), "Uncategorized", "Checking",
+                            "SHOP {} #1".format(i), t.get_amount()) for i, t in enumerate(ts[:9000])] + \
+               [Transaction(t.get_year(), t.get_month(), t.get_day(), "Uncategorized", "Checking",
+                            "Refund", t.get_amount()) for t in ts[9000:10000]] + \
+               [Transaction(2021, i % 12, i % 28, "Uncategorized", "Checking", "New {}".format(i), 100 + i)
+                for i in range(10000)]
+    n = 20
+    start = time.perf_counter()
+    reconcile_by_scan(imported[:n], ts, window)
+    print("Scan      : an estimated {:.3f} s".format((time.perf_counter()-start) * len(imported)/n))
+    start = time.perf_counter()
+    r = reconcile(imported, ts, "Checking")
+    print("Hash join : {:.3f} s, {} matched, {} new, {} conflicts".format(
+        time.perf_counter()-start, len(r.matched), len(r.new), len(r.conflicts)))
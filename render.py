@@ -0,0 +1,265 @@
+# render.py
+# Writes graphs to SVG, or PNG where PIL is installed, without a Tk window.
+# The backends take the create_ calls Graph.render makes on a tk.Canvas, so
+# a file holds the same items, at the same coordinates, as the window
+
+from account                    import Account
+from account_graph_rate         import AccountGraphRate
+from account_graph_compare      import AccountGraphCompare
+from account_graph_cash_flow    import AccountGraphCashFlow
+from graph                      import Graph
+from concurrent.futures        import ProcessPoolExecutor
+from xml.sax.saxutils           import escape, quoteattr
+import aggregate
+import os
+import re
+import time
+
+try:                                                # PIL is optional; only SVG is
+    from PIL import Image, ImageDraw, ImageFont     # written without it
+except ImportError:
+    Image = None
+
+charts = {"rate": AccountGraphRate, "compare": AccountGraphCompare, "cash_flow": AccountGraphCashFlow}
+formats = ("svg", "png") if Image is not None else ("svg",)
+
+height      = 600
+width       = 800
+line_height = 1.2           # Of text, in font sizes
+
+
+def _lines(text: str, y: float, size: int) -> [(str, float)]:
+    """Returns (line, y) of each line of text centred on y, as Tk places it
+    """
+    lines = text.split("\n")
+    top = y - (len(lines)-1) * size * line_height / 2
+    return [(s, top + i * size * line_height) for i, s in enumerate(lines)]
+
+
+class SvgCanvas:
+    def __init__(self, h: int, w: int, title=""):
+        """Initializes SvgCanvas of height h and width w
+        """
+        self._h         = h
+        self._w         = w
+        self._title     = title
+        self._elements  = list()
+
+
+    def _add(self, element: str) -> int:
+        self._elements.append(element)
+        return len(self._elements)
+
+
+    def create_line(self, *coords, fill="#000") -> int:
+        points = " ".join("{:.1f},{:.1f}".format(x, y) for x, y in zip(coords[::2], coords[1::2]))
+        return self._add('<polyline points="{}" fill="none" stroke="{}"/>'.format(points, fill))
+
+
+    def create_oval(self, x0, y0, x1, y1, fill="", outline="#000") -> int:
+        return self._add('<ellipse cx="{:.1f}" cy="{:.1f}" rx="{:.1f}" ry="{:.1f}" fill="{}" stroke="{}"/>'.format(
+            (x0+x1)/2, (y0+y1)/2, (x1-x0)/2, (y1-y0)/2, fill or "none", outline))
+
+
+    def create_polygon(self, *coords, fill="#000", outline="") -> int:
+        points = " ".join("{:.1f},{:.1f}".format(x, y) for x, y in zip(coords[::2], coords[1::2]))
+        return self._add('<polygon points="{}" fill="{}" stroke="{}"/>'.format(points, fill or "none", outline or "none"))
+
+
+    def create_text(self, x, y, text="", font=("Helvetica", -12), fill="#000") -> int:
+        family, size = font[0], abs(font[1])                                    # Negative sizes are pixels in Tk
+        spans = "".join('<tspan x="{:.1f}" y="{:.1f}">{}</tspan>'.format(x, ly, escape(s))
+                        for s, ly in _lines(text, y, size))
+        return self._add('<text font-family={} font-size="{}" fill="{}" text-anchor="middle" '
+                         'dominant-baseline="central">{}</text>'.format(quoteattr(family), size, fill, spans))
+
+
+    def svg(self) -> str:
+        return ('<svg xmlns="http://www.w3.org/2000/svg" width="{0}" height="{1}" viewBox="0 0 {0} {1}">\n'
+                '<title>{2}</title>\n<rect width="100%" height="100%" fill="#fff"/>\n{3}\n</svg>\n').format(
+                    self._w, self._h, escape(self._title), "\n".join(self._elements))
+
+
+    def write(self, filename: str) -> None:
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(self.svg())
+
+
+class PngCanvas:
+    def __init__(self, h: int, w: int, title=""):
+        """Initializes PngCanvas of height h and width w. Needs PIL
+        """
+        assert Image is not None, "PIL is not installed to write PNG"
+        self._image = Image.new("RGB", (w, h), "#fff")
+        self._draw  = ImageDraw.Draw(self._image)
+        self._font  = ImageFont.load_default()
+        self._n     = 0
+
+
+    def _add(self) -> int:
+        self._n += 1
+        return self._n
+
+
+    def create_line(self, *coords, fill="#000") -> int:
+        self._draw.line(list(zip(coords[::2], coords[1::2])), fill=fill)
+        return self._add()
+
+
+    def create_oval(self, x0, y0, x1, y1, fill="", outline="#000") -> int:
+        self._draw.ellipse([(x0, y0), (x1, y1)], fill=fill or None, outline=outline)
+        return self._add()
+
+
+    def create_polygon(self, *coords, fill="#000", outline="") -> int:
+        self._draw.polygon(list(zip(coords[::2], coords[1::2])), fill=fill or None, outline=outline or None)
+        return self._add()
+
+
+    def create_text(self, x, y, text="", font=("Helvetica", -12), fill="#000") -> int:
+        for s, ly in _lines(text, y, abs(font[1])):
+            left, top, right, bottom = self._draw.textbbox((0, 0), s, font=self._font)
+            self._draw.text((x - (right-left)/2, ly - (bottom-top)/2), s, fill=fill, font=self._font)
+        return self._add()
+
+
+    def write(self, filename: str) -> None:
+        self._image.save(filename, "PNG")
+
+
+def save(g: Graph, filename: str, h=None, w=None) -> None:
+    """Writes Graph g, at height h and width w, to filename: PNG if its name
+    ends in .png, and SVG otherwise
+    """
+    h = height if h is None else h
+    w = width if w is None else w
+    canvas = (PngCanvas if filename.lower().endswith(".png") else SvgCanvas)(h, w, g.title())
+    g.render(canvas, h, w)
+    canvas.write(filename)
+
+
+def filename(a: Account, chart: str, ext: str, year=None) -> str:
+    """Returns file name of a chart of Account a, of one year if given, with
+    characters other than letters, digits, dots and dashes as underscores
+    """
+    name = re.sub(r"[^A-Za-z0-9.-]+", "_", a.get_name())
+    if year is not None:
+        name += "_{}".format(year+1)
+    return "{}_{}.{}".format(name, chart, ext)
+
+
+def timeframe(a: Account, start: (int, int), end: (int, int)) -> [(int, int)]:
+    """Returns sorted (year, month) of the Budgets of a from start to end
+    inclusive
+    """
+    return [ym for ym in aggregate.months([a]) if start <= ym <= end]
+
+
+def timeframes(a: Account, start: (int, int), end: (int, int), by_year=False) -> [(int, [(int, int)])]:
+    """Returns (year, months) of each chart of a: one over every month from
+    start to end, with year None, or one for each year if by_year
+    """
+    tf = timeframe(a, start, end)
+    if len(tf) == 0:
+        return list()
+    if not by_year:
+        return [(None, tf)]
+    return [(y, [ym for ym in tf if ym[0] == y]) for y in sorted(set(y for y, m in tf))]
+
+
+class Months:
+    __slots__ = ("_name", "_kind", "_months")
+
+    def __init__(self, a: Account, tf: [(int, int)]):
+        """Initializes Months of Account a over the months tf: its name, kind,
+        and goal, reached and remain of each month, which is all a chart 
+        reads. Sent to worker processes in place of the Account, with its
+        Transactions and Budgets
+        """
+        self._name      = a.get_name()
+        self._kind      = a.get_kind()
+        self._months    = {(y, m): (a.get_goal(y,m), a.get_reached(y,m), a.get_remain(y,m)) for y, m in tf}
+
+    def get_name(self): return self._name
+    def get_kind(self): return self._kind
+    def get_goal(self, y, m): return self._months[(y, m)][0]
+    def get_reached(self, y, m): return self._months[(y, m)][1]
+    def get_remain(self, y, m): return self._months[(y, m)][2]
+
+
+def _render(item: tuple) -> (str, float):
+    """Writes the chart of a work item (chart, Months, timeframe, path, h, w).
+    Returns path and seconds taken. Runs in a worker process
+    """
+    start = time.perf_counter()
+    chart, months, tf, path, h, w = item
+    save(charts[chart](months, tf, window=False), path, h, w)
+    return path, time.perf_counter() - start
+
+
+def batch(ats: [Account], directory: str, start=None, end=None, ext="svg", h=None, w=None,
+          by_year=False, workers=1) -> [(str, float)]:
+    """Writes the rate, compare and cash flow charts of every Account with a
+    Budget from start to end, of each year if by_year, to directory. The 
+    charts are rendered by that many worker processes, as many as there are
+    CPUs if None, or in this process if 1.
+    Returns (path, seconds) of each file written
+    """
+    assert ext in formats, "Format {} is not available; choose from {}".format(ext, ", ".join(formats))
+    assert workers is None or workers >= 1, "Number of workers must be positive"
+    start = aggregate.all_time[0] if start is None else start
+    end = aggregate.all_time[1] if end is None else end
+    os.makedirs(directory, exist_ok=True)
+    items = list()
+    for a in ats:
+        for year, tf in timeframes(a, start, end, by_year):
+            months = Months(a, tf)
+            for chart in charts:
+                items.append((chart, months, tf, os.path.join(directory, filename(a, chart, ext, year)), h, w))
+    if workers == 1 or len(items) <= 1:
+        return [_render(item) for item in items]
+    with ProcessPoolExecutor(workers) as pool:
+        n = workers or os.cpu_count() or 1
+        return list(pool.map(_render, items, chunksize=max(1, len(items) // (n*4))))
+
+
+def summary(results: [(str, float)], seconds: float) -> str:
+    """Returns timing summary of a batch that took seconds
+    """
+    if len(results) == 0:
+        return "0 charts written"
+    busy = sum(s for p, s in results)
+    slowest = max(results, key=lambda r: r[1])
+    return ("{} charts written in {:.3f} s, {:.3f} s rendering ({:.1f} ms a chart), "
+            "slowest {} ({:.1f} ms)").format(
+                len(results), seconds, busy, busy/len(results)*1000, os.path.basename(slowest[0]), slowest[1]*1000)
+
+
+# Testing
+if __name__ == "__main__":
+    import tempfile, time
+    from transaction import Transaction
+
+    ts = [Transaction(2015, i % 12, 12, "Fast Food", "Cash", "Wendy's", 100 * (i+1)) for i in range(14)]
+    a = Account("Fast Food", 0, ts, {})
+    g = AccountGraphRate(a, timeframe(a, *aggregate.all_time), window=False)
+    canvas = SvgCanvas(300, 400, g.title())
+    g.render(canvas, 300, 400)
+    print(canvas.svg()[:600])
+
+    # Benchmark: every chart of 100 Accounts, over 5 years of months and for each year
+    import pickle
+    ats = [Account("Account {}".format(n), n % 2,
+                   [Transaction(2010 + i // 12, i % 12, d, "Account {}".format(n), "Cash", "Purchase", 100 + n*i)
+                    for i in range(60) for d in range(0, 28, 3)], {})
+           for n in range(100)]
+    tf = timeframe(ats[0], *aggregate.all_time)
+    print("Sent for one chart: Account {:,} bytes, Months {:,} bytes".format(
+        len(pickle.dumps(ats[0])), len(pickle.dumps(Months(ats[0], tf)))))
+    for by_year in (False, True):
+        for workers in (1, None):
+            with tempfile.TemporaryDirectory() as d:
+                start = time.perf_counter()
+                results = batch(ats, d, by_year=by_year, workers=workers)
+                print("{:8} {:>2} workers: {}".format("By year" if by_year else "All time", 
+                      workers or os.cpu_count(), summary(results, time.perf_counter()-start)))
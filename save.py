@@ -3,16 +3,28 @@
 
 from transaction import Transaction
 from account     import Account, Budget
+from collections import namedtuple
+import ledger_parser
 
 # file = "data.txt"
 
+# Rows of the data file. Every Transaction is written once, as a line of the 
+# transaction table; its ID is its position in that table, counting from 0. 
+# Accounts and their Budgets are written in tables of their own and refer to 
+# Transactions by ID
+AccountRow  = namedtuple("AccountRow", "name kind ids")     # Account table
+BudgetRow   = namedtuple("BudgetRow", "name budgets")       # Budget table
+
+row_names = dict(ledger_parser.constructors, AccountRow=AccountRow, BudgetRow=BudgetRow)
+
+
 def main(ts: [Transaction], ats: [Account], var, filename: str) -> None:
     """Writes to a specified document current session
     """
     opened_file = open(filename, "w")
     print("    Export File Opened")
     print("    Beginning Export") 
-    for i in (ts if ats == [] else ats):
+    for i in rows(ts, ats):
         try:
             opened_file.write(repr(i)+"\n")
         except Exception as e:
@@ -20,6 +32,22 @@ def main(ts: [Transaction], ats: [Account], var, filename: str) -> None:
     opened_file.write(repr(var) + "\n")
     opened_file.close() 
     print("    Export File Closed") 
+
+
+def rows(ts: [Transaction], ats: [Account]) -> "generator":
+    """Yields the rows of the transaction, Account and Budget tables. 
+    Transactions of Accounts that are not in ts are added to the 
+    transaction table
+    """
+    ids = dict()                                # Transaction -> ID
+    for t in ts + [t for a in ats for t in a.get_ts()]:
+        if t not in ids: 
+            ids[t] = len(ids)
+            yield t
+    for a in ats: 
+        yield AccountRow(a.get_name(), a.get_kind(), [ids[t] for t in a.get_ts()])
+    for a in ats:
+        yield BudgetRow(a.get_name(), dict(a.get_budgets()))
     
     
 if __name__ == "__main__":
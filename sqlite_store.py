@@ -0,0 +1,390 @@
+# sqlite_store.py
+# Stores the ledger in an SQLite database instead of a text data file
+
+from transaction import Transaction
+from account     import Account, Budget
+import ledger_parser
+import changes
+import sqlite3
+
+_schema = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id          INTEGER PRIMARY KEY,
+    year        INTEGER NOT NULL,
+    month       INTEGER NOT NULL,
+    day         INTEGER NOT NULL,
+    dr_account  TEXT NOT NULL,
+    cr_account  TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount      INTEGER NOT NULL,
+    currency    TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (year, month, day);
+CREATE INDEX IF NOT EXISTS transactions_dr ON transactions (dr_account);
+CREATE INDEX IF NOT EXISTS transactions_cr ON transactions (cr_account);
+CREATE INDEX IF NOT EXISTS transactions_description ON transactions (description);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL,
+    kind        INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS accounts_name ON accounts (name);
+
+CREATE TABLE IF NOT EXISTS account_ts (
+    account_id  INTEGER NOT NULL,
+    pos         INTEGER NOT NULL,
+    tid         INTEGER NOT NULL,
+    PRIMARY KEY (account_id, pos));
+CREATE INDEX IF NOT EXISTS account_ts_tid ON account_ts (tid);
+
+CREATE TABLE IF NOT EXISTS budgets (
+    account_id  INTEGER NOT NULL,
+    year        INTEGER NOT NULL,
+    month       INTEGER NOT NULL,
+    goal        INTEGER NOT NULL,
+    reached     INTEGER NOT NULL,
+    ts_amt      INTEGER NOT NULL,
+    PRIMARY KEY (account_id, year, month));
+
+CREATE TABLE IF NOT EXISTS variables (
+    id          INTEGER PRIMARY KEY CHECK (id = 0),
+    value       TEXT NOT NULL);
+"""
+
+extensions = (".db", ".sqlite", ".sqlite3")
+
+
+def is_database(filename: str) -> bool:
+    """Returns True if the data file named should be stored with SQLite
+    """
+    return filename.endswith(extensions)
+
+
+def _row(t: Transaction) -> tuple:
+    """Returns the columns of a Transaction, without its ID
+    """
+    return (t.get_year(), t.get_month(), t.get_day(), t.get_dr_account(), t.get_cr_account(),
+            t.get_description(), t.get_amount(), t.get_currency())
+
+
+def _budget_rows(a: Account) -> {(int, int): Budget}:
+    """Returns Budgets of an Account by (year, month)
+    """
+    return {(y, m): b for y, ms in a.get_budgets().items() for m, b in ms.items()}
+
+
+class SQLiteStore:
+    def __init__(self, filename: str):
+        self._con       = sqlite3.connect(filename)
+        self._con.executescript(_schema)
+        self._ts        = dict()        # row ID -> Transaction; the row ID is also set as its ID
+        self._aids      = dict()        # id() of Account -> row ID
+        self._ats       = dict()        # row ID -> Account
+        self._budgets   = dict()        # row ID of Account -> {(year, month): Budget} as stored
+
+
+    def close(self) -> None:
+        self._con.close()
+
+
+    def load(self) -> ({str: None}, [Account], [Transaction]):
+        """Returns a 3-tuple (variables, Accounts, Transactions) read from the
+        database. Accounts share the Transaction objects returned
+        """
+        print("    Opening database")
+        self._ts.clear(); self._aids.clear(); self._ats.clear(); self._budgets.clear()
+        for r in self._con.execute(
+                "SELECT id, year, month, day, dr_account, cr_account, description, amount, "
+                "currency FROM transactions ORDER BY id"):
+            t = Transaction(*r[1:])
+            t.set_id(r[0])
+            self._ts[r[0]] = t
+
+        account_ts = dict()
+        for aid, tid in self._con.execute(
+                "SELECT account_id, tid FROM account_ts ORDER BY account_id, pos"):
+            account_ts.setdefault(aid, list()).append(self._ts[tid])
+        budgets = dict()
+        for aid, y, m, g, r, n in self._con.execute(
+                "SELECT account_id, year, month, goal, reached, ts_amt FROM budgets"):
+            budgets.setdefault(aid, dict()).setdefault(y, dict())[m] = Budget(g, r, n)
+        for aid, name, kind in self._con.execute("SELECT id, name, kind FROM accounts ORDER BY id"):
+            a = Account(name, kind, account_ts.get(aid, list()), budgets.get(aid, dict()))
+            self._ats[aid] = a
+            self._aids[id(a)] = aid
+            self._budgets[aid] = _budget_rows(a)
+
+        var = dict()
+        for (value,) in self._con.execute("SELECT value FROM variables"):
+            var = ledger_parser.parse_line(value)
+        print("    Database read")
+        return var, list(self._ats.values()), list(self._ts.values())
+
+
+    def save(self, ts: [Transaction], ats: [Account], var) -> None:
+        """Replaces the contents of the database with the current session
+        """
+        with self._con:
+            for table in ("transactions", "accounts", "account_ts", "budgets"):
+                self._con.execute("DELETE FROM " + table)
+            self._ts.clear(); self._aids.clear(); self._ats.clear(); self._budgets.clear()
+            for t in ts + [t for a in ats for t in a.get_ts()]:
+                if not self._stored(t):
+                    self._insert_transaction(t)
+            for a in ats:
+                self._insert_account(a)
+            self._write_variables(var)
+        changes.clear()
+
+
+    def write_changes(self, ts: [Transaction], ats: [Account], var) -> None:
+        """Writes only the rows changed since the last write, inside a single
+        database transaction: those of Transactions changed or deleted, their
+        references from the Accounts they name, and the Budgets of Accounts
+        changed
+        """
+        dirty   = changes.dirty()
+        removed = changes.removed()
+        with self._con:
+            for t in removed:
+                if type(t) == Transaction and self._stored(t):
+                    del self._ts[t.get_id()]
+                    self._con.execute("DELETE FROM transactions WHERE id = ?", (t.get_id(),))
+                    self._con.execute("DELETE FROM account_ts WHERE tid = ?", (t.get_id(),))
+                elif type(t) == Account and id(t) in self._aids:
+                    self._delete_account(self._aids[id(t)])
+            edited = [t for t in dirty if type(t) == Transaction]
+            for t in edited:
+                if self._stored(t):
+                    self._con.execute(
+                        "UPDATE transactions SET year = ?, month = ?, day = ?, dr_account = ?, "
+                        "cr_account = ?, description = ?, amount = ?, currency = ? "
+                        "WHERE id = ?", _row(t) + (t.get_id(),))
+                else:
+                    self._insert_transaction(t)
+            for a in dirty:
+                if type(a) == Account and id(a) not in self._aids:              # Created since the last write
+                    self._insert_account(a)
+            by_name = {a.get_name(): a for a in reversed(ats)}                  # First Account of a name wins
+            for t in edited:
+                for name in set((t.get_dr_account(), t.get_cr_account())):
+                    a = by_name.get(name)
+                    if a is not None and id(a) in self._aids and a.find(t) is t:
+                        self._reference(self._aids[id(a)], t)
+            for a in dirty:
+                if type(a) == Account and id(a) in self._aids:
+                    self._update_account(self._aids[id(a)], a)
+            self._write_variables(var)
+        changes.clear()
+
+
+    def _reference(self, aid: int, t: Transaction) -> None:
+        """Appends Transaction to the references of an Account, unless it is
+        already there
+        """
+        if self._con.execute("SELECT 1 FROM account_ts WHERE account_id = ? AND tid = ?",
+                             (aid, t.get_id())).fetchone() is None:
+            self._con.execute(
+                "INSERT INTO account_ts (account_id, pos, tid) SELECT ?, COALESCE(MAX(pos), -1) + 1, ? "
+                "FROM account_ts WHERE account_id = ?", (aid, t.get_id(), aid))
+
+
+    def _update_account(self, aid: int, a: Account) -> None:
+        """Writes name and kind of an Account, and those of its Budgets that
+        differ from the stored ones
+        """
+        self._con.execute("UPDATE accounts SET name = ?, kind = ? WHERE id = ?",
+                          (a.get_name(), a.get_kind(), aid))
+        stored, current = self._budgets[aid], _budget_rows(a)
+        self._con.executemany(
+            "INSERT OR REPLACE INTO budgets (account_id, year, month, goal, reached, ts_amt) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((aid, y, m) + tuple(b) for (y, m), b in current.items() if stored.get((y, m)) != b))
+        self._con.executemany(
+            "DELETE FROM budgets WHERE account_id = ? AND year = ? AND month = ?",
+            ((aid, y, m) for y, m in stored if (y, m) not in current))
+        self._budgets[aid] = current
+
+
+    def _stored(self, t: Transaction) -> bool:
+        """Returns True if this Transaction object has a row in the database
+        """
+        return self._ts.get(t.get_id()) is t
+
+
+    def _insert_transaction(self, t: Transaction) -> int:
+        """Inserts a Transaction and returns its row ID
+        """
+        tid = self._con.execute(
+            "INSERT INTO transactions (year, month, day, dr_account, cr_account, description, "
+            "amount, currency) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _row(t)).lastrowid
+        t.set_id(tid)
+        self._ts[tid] = t
+        return tid
+
+
+    def _insert_account(self, a: Account) -> int:
+        """Inserts an Account, its Transaction references and its Budgets.
+        Returns its row ID
+        """
+        aid = self._con.execute(
+            "INSERT INTO accounts (name, kind) VALUES (?, ?)",
+            (a.get_name(), a.get_kind())).lastrowid
+        self._aids[id(a)] = aid
+        self._ats[aid] = a
+        self._budgets[aid] = _budget_rows(a)
+        for t in a.get_ts():
+            if not self._stored(t):
+                self._insert_transaction(t)
+        self._con.executemany(
+            "INSERT INTO account_ts (account_id, pos, tid) VALUES (?, ?, ?)",
+            ((aid, n, t.get_id()) for n, t in enumerate(a.get_ts())))
+        self._con.executemany(
+            "INSERT INTO budgets (account_id, year, month, goal, reached, ts_amt) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((aid, y, m, b.goal, b.reached, b.ts_amt)
+             for y, ms in a.get_budgets().items() for m, b in ms.items()))
+        return aid
+
+
+    def _delete_account(self, aid: int) -> None:
+        """Deletes an Account, its Transaction references and its Budgets
+        """
+        a = self._ats.pop(aid)
+        del self._aids[id(a)]
+        del self._budgets[aid]
+        self._con.execute("DELETE FROM accounts WHERE id = ?", (aid,))
+        self._con.execute("DELETE FROM account_ts WHERE account_id = ?", (aid,))
+        self._con.execute("DELETE FROM budgets WHERE account_id = ?", (aid,))
+
+
+    def _write_variables(self, var) -> None:
+        self._con.execute("INSERT OR REPLACE INTO variables (id, value) VALUES (0, ?)", (repr(var),))
+
+
+    # Queries. Each returns the in-memory objects, so the database must have
+    # been written since the last change
+    def by_pair(self, y: int, m: int) -> [Transaction]:
+        """Returns Transactions of a year and month, ordered by day
+        """
+        return [self._ts[tid] for (tid,) in self._con.execute(
+            "SELECT id FROM transactions WHERE year = ? AND month = ? ORDER BY day, id", (y, m))]
+
+
+    def account_ts(self, a: Account, y0: int, m0: int, y1: int, m1: int) -> [Transaction]:
+        """Returns Transactions of an Account whose year is in y0 to y1 and
+        whose month is in m0 to m1, ordered by date
+        """
+        return [self._ts[tid] for (tid,) in self._con.execute(
+            "SELECT t.id FROM account_ts a JOIN transactions t ON t.id = a.tid "
+            "WHERE a.account_id = ? AND t.year BETWEEN ? AND ? AND t.month BETWEEN ? AND ? "
+            "ORDER BY t.year, t.month, t.day, t.id",
+            (self._aids[id(a)], y0, y1, m0, m1))]
+
+
+    def account_amount(self, a: Account, tf: [(int, int)]) -> int:
+        """Returns sum of the amounts of an Account's Transactions from the
+        first to the last month of timeframe tf
+        """
+        if len(tf) == 0:
+            return 0
+        (y0, m0), (y1, m1) = min(tf), max(tf)
+        (total,) = self._con.execute(
+            "SELECT SUM(t.amount) FROM account_ts a JOIN transactions t ON t.id = a.tid "
+            "WHERE a.account_id = ? AND t.year * 12 + t.month BETWEEN ? AND ?",
+            (self._aids[id(a)], y0*12 + m0, y1*12 + m1)).fetchone()
+        return total or 0
+
+
+    def kind_amount(self, k: int) -> int:
+        """Returns sum of the amounts of all Transactions of Accounts of kind k
+        """
+        (total,) = self._con.execute(
+            "SELECT SUM(t.amount) FROM accounts c JOIN account_ts a ON a.account_id = c.id "
+            "JOIN transactions t ON t.id = a.tid WHERE c.kind = ?", (k,)).fetchone()
+        return total or 0
+
+
+def load(filename: str) -> ({str: None}, [Account], [Transaction]):
+    """Returns a 3-tuple (variables, Accounts, Transactions) read from a
+    database, as initialize.main does for a data file
+    """
+    store = SQLiteStore(filename)
+    try:
+        return store.load()
+    finally:
+        store.close()
+
+
+def main(ts: [Transaction], ats: [Account], var, filename: str) -> None:
+    """Writes the current session to a database, as save.main does for a
+    data file
+    """
+    store = SQLiteStore(filename)
+    try:
+        store.save(ts, ats, var)
+    finally:
+        store.close()
+
+
+# Testing
+if __name__ == "__main__":
+    import account_init, os
+    t0 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t1 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t2 = Transaction(2015, 10, 22, "Drinks", "Savings", "Coffee", 200)
+    ts  = [t0, t1, t2]
+    ats = account_init.create_from(ts)
+
+    if os.path.isfile("test.db"):
+        os.remove("test.db")
+    main(ts, ats, {"user": 1}, "test.db")
+    store = SQLiteStore("test.db")
+    var, ats, ts = store.load()
+    print(var)
+    for a in ats:
+        print(a)
+
+    ts[0].set_amount(400)
+    ats[0].set_goal(2015, 11, -1000)
+    store.write_changes(ts, ats, var)
+    print(store.by_pair(2015, 10))
+    print(store.account_ts(ats[0], 2015, 0, 2015, 11))
+    print(store.account_amount(ats[0], [(2015, 10), (2015, 11)]))
+    store.close()
+    print(load("test.db")[1][0])
+
+    # Testing an entry naming a stored Account and a new one, and a deletion
+    import account_book
+    store = SQLiteStore("test.db")
+    var, ats, ts = store.load()
+    t3 = Transaction(2015, 11, 1, "Rent", "Cash", "December", 900)
+    changes.mark(t3)
+    ts.append(t3)
+    account_book.AccountBook(ats).add(t3)
+    for a in ats:
+        if ts[1] in a:
+            a.remove(ts[1])
+    changes.mark_removed(ts[1])
+    ts.remove(ts[1])
+    store.write_changes(ts, ats, var)
+    store.close()
+    stored = {a.get_name(): a for a in load("test.db")[1]}
+    print(all(a.get_ts() == stored[a.get_name()].get_ts() and a.get_budgets() == stored[a.get_name()].get_budgets()
+              for a in ats), len(stored))
+
+    # Benchmark: writing one entry naming an Account of 100,000 Transactions
+    import time
+    ts = [Transaction(2000 + i % 20, i % 12, i % 28, "Account {}".format(i % 50), "Cash", "Description", i)
+          for i in range(100000)]
+    main(ts, account_init.create_from(ts), {"user": 1}, "test.db")
+    store = SQLiteStore("test.db")
+    var, ats, ts = store.load()
+    t = Transaction(2015, 0, 1, "Account 0", "Cash", "Entered", 100)
+    changes.mark(t)
+    ts.append(t)
+    account_book.AccountBook(ats).add(t)
+    start = time.perf_counter()
+    store.write_changes(ts, ats, var)
+    print("Write of one entry: {:.3f} s".format(time.perf_counter()-start))
+    store.close()
+    os.remove("test.db")
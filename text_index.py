@@ -0,0 +1,240 @@
+# text_index.py
+# Transactions indexed by the words of their description and Account names
+
+from transaction import Transaction
+from bisect      import bisect_left
+import re
+import changes
+
+
+def tokens(s: str) -> [str]:
+    """Returns lowercase words of s. Apostrophes are dropped, so that
+    "Wendy's" is found by "wendys" and "wendy's" alike
+    """
+    return re.findall(r"[a-z0-9]+", s.lower().replace("'", ""))
+
+
+class TextIndex:
+    def __init__(self, ts: [Transaction]):
+        """Initializes TextIndex over the list ts. Transactions appended to ts
+        must be passed to add; edits and deletions recorded by changes are
+        picked up by refresh. The index is built when first used
+        """
+        self._ts    = ts
+        self._built = False
+
+
+    def _build(self) -> None:
+        self._postings  = dict()        # Word -> id() of the one Transaction having it, or set of id() of several
+        self._words     = list()        # Words filed, sorted for prefix lookups, and some no longer filed
+        self._pending   = set()         # Words filed since _words was sorted
+        self._dropped   = 0             # Words of _words no longer filed
+        self._filed     = dict()        # id() of Transaction -> (Transaction, generation, sequence number, words)
+        self._names     = dict()        # Account name -> its words, of which there are few
+        self._next      = 0             # Sequence number keeping insertion order within a day
+        self._seen      = changes.generation
+        self._built     = True
+        for t in self._ts:
+            self._file(t)
+
+
+    def __len__(self):
+        self.refresh()
+        return len(self._filed)
+
+
+    def _name_words(self, name: str) -> [str]:
+        words = self._names.get(name)
+        if words is None:
+            words = self._names[name] = tokens(name)
+        return words
+
+
+    def _sorted(self, w: str) -> bool:
+        """Returns True if word w is in _words
+        """
+        i = bisect_left(self._words, w)
+        return i < len(self._words) and self._words[i] == w
+
+
+    def _file(self, t: Transaction, seq=None) -> None:
+        """Adds Transaction to the postings of its words. A word's first 
+        Transaction is posted as its id() alone, sparing a set for the many
+        words, such as reference numbers, that only one Transaction has
+        """
+        words = tuple(set(tokens(t.get_description()) + self._name_words(t.get_dr_account()) +
+                          self._name_words(t.get_cr_account())))
+        if seq is None:
+            seq = self._next
+            self._next += 1
+        self._filed[id(t)] = (t, t.get_gen(), seq, words)
+        for w in words:
+            ids = self._postings.get(w)
+            if ids is None:
+                self._postings[w] = id(t)
+                if len(self._words) != 0 and self._sorted(w):                   # Filed again
+                    self._dropped -= 1
+                else:
+                    self._pending.add(w)
+            elif type(ids) == int:
+                self._postings[w] = {ids, id(t)}
+            else:
+                ids.add(id(t))
+
+
+    def _unfile(self, t: Transaction) -> None:
+        _, _, _, words = self._filed.pop(id(t))
+        for w in words:
+            ids = self._postings[w]
+            if type(ids) == int:
+                del self._postings[w]
+                if w in self._pending:
+                    self._pending.discard(w)
+                else:
+                    self._dropped += 1
+            else:
+                ids.discard(id(t))
+                if len(ids) == 1:
+                    self._postings[w] = ids.pop()
+
+
+    def add(self, t: Transaction) -> None:
+        """Adds a Transaction appended to the list. Before the index is built
+        there is nothing to do
+        """
+        if self._built and id(t) not in self._filed:
+            self._file(t)
+
+
+    def add_all(self, ts: [Transaction]) -> None:
+        for t in ts:
+            self.add(t)
+
+
+    def refresh(self) -> None:
+        """Refiles Transactions edited, and drops Transactions deleted, since
+        the index was last brought up to date, or builds the index if it is
+        not yet
+        """
+        if not self._built:
+            self._build()
+            return
+        if self._seen == changes.generation:
+            return
+        if self._seen < changes.horizon:                                        # Changes since are not all recorded
+            self._build()
+            return
+        for t in changes.removed_since(self._seen):
+            if id(t) in self._filed:
+                self._unfile(t)
+        for t in changes.dirty_since(self._seen):
+            if id(t) in self._filed and self._filed[id(t)][1] != t.get_gen():
+                seq = self._filed[id(t)][2]
+                self._unfile(t)
+                self._file(t, seq)
+        self._seen = changes.generation
+
+
+    def _matching(self, prefix: str) -> [str]:
+        """Returns words of the index starting with prefix. Words filed since
+        the last lookup are merged into _words first, in one sort of what is
+        mostly sorted already
+        """
+        if len(self._pending) != 0:
+            self._words.extend(self._pending)
+            self._words.sort()
+            self._pending.clear()
+        if self._dropped > len(self._words) // 2:
+            self._words = [w for w in self._words if w in self._postings]
+            self._dropped = 0
+        i = j = bisect_left(self._words, prefix)
+        while j < len(self._words) and self._words[j].startswith(prefix):
+            j += 1
+        return [w for w in self._words[i:j] if w in self._postings]
+
+
+    def _ids(self, w: str) -> set:
+        ids = self._postings[w]
+        return {ids} if type(ids) == int else ids
+
+
+    def find(self, query: str) -> [Transaction]:
+        """Returns Transactions having, for every word of query, a word of
+        their description or Account names that starts with it. Returned in
+        date order
+        """
+        self.refresh()
+        prefixes = set(tokens(query))
+        if len(prefixes) == 0:
+            return list()
+        matching = {p: self._matching(p) for p in prefixes}
+        sizes = {p: sum(len(self._ids(w)) for w in ws) for p, ws in matching.items()}
+        first = min(prefixes, key=sizes.get)                                    # Fewest Transactions
+        ids = set().union(*(self._ids(w) for w in matching[first]))
+        for p in prefixes - {first}:
+            if len(matching[p]) == 1:
+                ids &= self._ids(matching[p][0])
+            else:                                                               # Words of each left are checked instead
+                ids = set(i for i in ids if any(w.startswith(p) for w in self._filed[i][3]))
+        found = [self._filed[i] for i in ids]
+        found.sort(key=lambda f: (f[0].get_date(), f[2]))
+        return [f[0] for f in found]
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+
+    t0 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t1 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t2 = Transaction(2016, 0, 22, "Drinks", "Savings", "Wendy's Coffee", 200)
+    ts = [t0, t1, t2]
+    index = TextIndex(ts)
+    print(index.find("wendy's"))
+    print(index.find("wen cash"))
+    print(index.find("fast"), index.find(""))
+    t1.set_description("Burger King")
+    print(index.find("wendy"), index.find("burger"))
+    changes.mark_removed(t2); ts.remove(t2)
+    print(index.find("coffee"), len(index))
+    t3 = Transaction(2016, 1, 2, "Drinks", "Cash", "Zebra Cafe", 300)
+    ts.append(t3); index.add(t3)
+    print(index.find("zeb"), index.find("cafe drinks"))
+    changes.mark_removed(t3); ts.remove(t3)
+    print(index.find("zeb"), len(index))
+
+    # Benchmark: 20 searches over 1,000,000 Transactions, the scan extrapolated from 2
+    places = ["Wendy's", "McDonald's", "In-n-Out", "Coffee Bean", "Burger King"]
+    n = 1000000
+    ts = [Transaction(1990 + i % 30, i % 12, i % 28, "Fast Food", "Cash",
+                      "{} #{}".format(places[i % 5], i % 997), i) for i in range(n)]
+    queries = ["wendy 13", "in n out 500", "coffee bean 777"]
+    start = time.perf_counter()
+    for i in range(2):
+        words = tokens(queries[i % 3])
+        [t for t in ts if all(any(w1.startswith(w) for w1 in tokens(t.get_description())) for w in words)]
+    print("Scan  : an estimated {:.3f} s".format((time.perf_counter()-start) * 10))
+
+    start = time.perf_counter()
+    index = TextIndex(ts)
+    index.refresh()
+    print("Build : {:.3f} s".format(time.perf_counter()-start))
+    start = time.perf_counter()
+    for i in range(20):
+        found = index.find(queries[i % 3])
+    print("Index : {:.3f} s, {} found by the last".format(time.perf_counter()-start, len(found)))
+
+    # Benchmark: builds over descriptions with a unique reference number each
+    for n in (100000, 200000, 400000):
+        ts = [Transaction(2015, i % 12, i % 28, "Fast Food", "Cash", "Ref {}".format(i), i) for i in range(n)]
+        start = time.perf_counter()
+        index = TextIndex(ts)
+        index.refresh()
+        print("Build of {:,} words: {:.3f} s".format(n, time.perf_counter()-start))
+    start = time.perf_counter()
+    for i in range(1000):                                                       # Entered one at a time, each with a new word
+        t = Transaction(2016, 0, 1, "Fast Food", "Cash", "Ref new{}".format(i), 1)
+        ts.append(t)
+        index.add(t)
+    print("1,000 adds of new words: {:.3f} s, then a search: {} found".format(
+        time.perf_counter()-start, len(index.find("new99"))))
@@ -0,0 +1,196 @@
+# time_index.py
+# Transactions kept in date order, for range queries by bisection
+
+from transaction import Transaction, pack_date
+from bisect      import bisect_left
+import changes
+
+
+class TimeIndex:
+    def __init__(self, ts: [Transaction]):
+        """Initializes TimeIndex over the list ts. Transactions appended to ts
+        must be passed to add; edits and deletions recorded by changes are
+        picked up by refresh. The index is built when first used
+        """
+        self._ts    = ts
+        self._built = False
+
+
+    def _build(self) -> None:
+        self._keys      = list()        # (packed date, sequence number), sorted
+        self._sorted    = list()        # Transaction of each key
+        self._filed     = dict()        # id() of Transaction -> (generation, key)
+        self._counts    = dict()        # (y, m) -> number of Transactions
+        self._next      = 0             # Sequence number keeping insertion order within a day
+        self._options   = dict()        # Cached option lists, until a month gains or loses its last Transaction
+        self._seen      = changes.generation
+        self._built     = True
+        for t in sorted(self._ts, key=lambda t: t.get_date()):                  # Appended in order, without bisection
+            key = (t.get_date(), self._next)
+            self._next += 1
+            self._keys.append(key)
+            self._sorted.append(t)
+            self._filed[id(t)] = (t.get_gen(), key)
+            k = (t.get_year(), t.get_month())
+            self._counts[k] = self._counts.get(k, 0) + 1
+
+
+    def __len__(self):
+        self.refresh()
+        return len(self._sorted)
+
+
+    def _file(self, t: Transaction) -> None:
+        key = (t.get_date(), self._next)
+        self._next += 1
+        i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._sorted.insert(i, t)
+        self._filed[id(t)] = (t.get_gen(), key)
+        k = (t.get_year(), t.get_month())
+        self._counts[k] = self._counts.get(k, 0) + 1
+        if self._counts[k] == 1:
+            self._options.clear()
+
+
+    def _unfile(self, t: Transaction) -> None:
+        _, key = self._filed.pop(id(t))
+        i = bisect_left(self._keys, key)
+        del self._keys[i]
+        del self._sorted[i]
+        date = key[0]
+        k = ((date >> 9) - 1, ((date >> 5) & 15) - 1)
+        self._counts[k] -= 1
+        if self._counts[k] == 0:
+            del self._counts[k]
+            self._options.clear()
+
+
+    def add(self, t: Transaction) -> None:
+        """Adds a Transaction appended to the list. Before the index is built
+        there is nothing to do
+        """
+        if self._built and id(t) not in self._filed:
+            self._file(t)
+
+
+    def add_all(self, ts: [Transaction]) -> None:
+        for t in ts:
+            self.add(t)
+
+
+    def refresh(self) -> None:
+        """Moves Transactions edited, and drops Transactions deleted, since the
+        index was last brought up to date, or builds the index if it is not
+        yet
+        """
+        if not self._built:
+            self._build()
+            return
+        if self._seen == changes.generation:
+            return
+        if self._seen < changes.horizon:                                        # Changes since are not all recorded
+            self._build()
+            return
+        for t in changes.removed_since(self._seen):
+            if id(t) in self._filed:
+                self._unfile(t)
+        for t in changes.dirty_since(self._seen):
+            if id(t) in self._filed and self._filed[id(t)][0] != t.get_gen():
+                self._unfile(t)
+                self._file(t)
+        self._seen = changes.generation
+
+
+    def between(self, start: (int, int, int), end: (int, int, int)) -> [Transaction]:
+        """Returns Transactions dated from (year, month, day) start to end
+        inclusive, in date order
+        """
+        self.refresh()
+        lo = bisect_left(self._keys, (pack_date(*start), -1))
+        hi = bisect_left(self._keys, (pack_date(*end) + 1, -1))
+        return self._sorted[lo:hi]
+
+
+    def year(self, y: int) -> [Transaction]:
+        return self.between((y, 0, 0), (y, 11, 30))
+
+
+    def pair(self, y: int, m: int) -> [Transaction]:
+        return self.between((y, m, 0), (y, m, 30))
+
+
+    def month(self, m: int) -> [Transaction]:
+        """Returns Transactions of month m of every year, in date order
+        """
+        return [t for y in self.years() for t in self.pair(y, m)]
+
+
+    def custom(self, y0: int, m0: int, y1: int, m1: int) -> [Transaction]:
+        """Returns Transactions whose year is in y0 to y1 and whose month is in
+        m0 to m1, in date order
+        """
+        return [t for y in self.years() if y0 <= y <= y1 for t in self.between((y, m0, 0), (y, m1, 30))]
+
+
+    def years(self) -> [int]:
+        """Returns sorted distinct years of the Transactions
+        """
+        self.refresh()
+        if "years" not in self._options:
+            self._options["years"] = sorted(set(y for y, _ in self._counts))
+        return self._options["years"]
+
+
+    def months(self, y=None) -> [int]:
+        """Returns sorted distinct months of the Transactions, of year y only
+        if given
+        """
+        self.refresh()
+        if ("months", y) not in self._options:
+            self._options[("months", y)] = sorted(set(m for y1, m in self._counts if y is None or y1 == y))
+        return self._options[("months", y)]
+
+
+# Testing
+if __name__ == "__main__":
+    import time
+
+    t0 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t1 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t2 = Transaction(2016, 0, 22, "Drinks", "Savings", "Coffee", 200)
+    ts = [t0, t1, t2]
+    index = TimeIndex(ts)
+    print(index.years(), index.months(), index.months(2016))
+    print(index.pair(2015, 10))
+    t1.set_year(2017)
+    print(index.years(), index.year(2017))
+    changes.mark_removed(t2); ts.remove(t2)
+    print(index.years(), len(index))
+
+    # Benchmark: 20 month queries and option lists over 1,000,000 Transactions
+    n = 1000000
+    ts = [Transaction(1990 + i % 30, i % 12, i % 28, "Fast Food", "Cash", "Description", i)
+          for i in range(n)]
+    start = time.perf_counter()
+    for i in range(20):
+        sorted(set(t.get_year() for t in ts))
+        [t for t in ts if t.get_year() == 1990 + i % 30 and t.get_month() == i % 12]
+    print("Scan       : {:.3f} s".format(time.perf_counter()-start))
+
+    start = time.perf_counter()
+    index = TimeIndex(ts)
+    index.refresh()
+    print("Index build: {:.3f} s".format(time.perf_counter()-start))
+    start = time.perf_counter()
+    for i in range(20):
+        index.years()
+        index.pair(1990 + i % 30, i % 12)
+    print("Bisect     : {:.3f} s".format(time.perf_counter()-start))
+
+    start = time.perf_counter()
+    for i in range(20):                                                         # An edit, then the ledger written
+        ts[i].set_day(i % 28 + 1)
+        changes.clear()
+        index.pair(1990 + i % 30, i % 12)
+    print("Edit, write: {:.3f} s".format(time.perf_counter()-start))
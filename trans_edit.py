@@ -4,7 +4,11 @@
 from transaction    import Transaction
 from account        import Account  
 from trans_view     import view, header
+from journal        import Edit, Delete
+from time_index     import TimeIndex
+from copy           import copy
 import basecui      as bc
+import changes
 
 as_attrib = {
     "yrr": "year", 
@@ -33,35 +37,36 @@ EDIT TRANSACTION MENU
     [esc]    : Return to previous menu""" 
 
 
-def main(ts: [Transaction], ats: [Account]) -> None:
+def main(ts: [Transaction], ats: [Account], jn=None, index: TimeIndex = None) -> None:
     """Revises Transaction from a Transaction collection, based on 
-    user input 
+    user input. Changes are recorded in the Journal jn if given. Transactions 
+    are selected from index, a TimeIndex over ts, if given
     """
+    if index is None: 
+        index = TimeIndex(ts)
     editing = True 
     while editing: 
-        t = _select_trans(ts)
+        t = _select_trans(index)
         if isinstance(t, Transaction): 
-            menu(ts, ts.index(t), ats)
+            menu(ts, ts.index(t), ats, jn)
         editing = bc.binary_question("Edit another transaction ([y]es or [n]o): ", "y", "n")
 
 
-def _select_trans(ts) -> Transaction or None:
+def _select_trans(index: TimeIndex) -> Transaction or None:
     """Returns transaction selected based on iteration
     """
-    def _cond(y,m,t): return t.get_year() == y and t.get_month() == bc.months_to_int[m]
-    
     print("Unique Years\n"+("=" * 40))
-    y = bc.trans_timeframe(sorted(set(t.get_year() for t in ts)) + [-1])
+    y = bc.trans_timeframe(index.years() + [-1])
     if y == -1: 
         return 
     
     print("\nUnique Months\n"+("=" * 40))
-    s = (bc.months_abv(m) for m in sorted(set(t.get_month() for t in ts if t.get_year() == y)))
+    s = (bc.months_abv(m) for m in index.months(y))
     m = bc.trans_timeframe(list(s) + [-1])
     if m == -1: 
         return 
 
-    ts_tf = sorted((t for t in ts if _cond(y,m,t)), key = lambda x: x.get_day())
+    ts_tf = index.pair(y, bc.months_to_int[m])                 # Already ordered by day
     
     while True:     
         try: 
@@ -76,7 +81,7 @@ def _select_trans(ts) -> Transaction or None:
             print("    An error has occurred: " + str(e))
              
     
-def menu(ts, i, ats) -> None:
+def menu(ts, i, ats, jn=None) -> None:
     """Revises Transaction object based on user input 
     """ 
     attribs = ("yrr", "mth", "day", "dsc", "dac", "cac", "crr", "flw", "amt",
@@ -99,16 +104,17 @@ def menu(ts, i, ats) -> None:
             assert choice in attribs, "{} not an option.".format(choice)
             if choice == "esc":
                 break
-            _new_input(ts, i, as_attrib[choice], ats)
+            _new_input(ts, i, as_attrib[choice], ats, jn)
             editing = bc.binary_question("Continue editing ([y]es or [n]o): ", "y", 'n')
         except Exception as e: 
             print("    An error occured: transedit.main: {}".format(e))
             
             
-def _new_input(ts: [Transaction], trans_index: int, attrib: str, ats: [Account]) -> None:
+def _new_input(ts: [Transaction], trans_index: int, attrib: str, ats: [Account], jn=None) -> None:
     """Mutates a transaction based on user input
     """
     trans_to_edit = ts[trans_index]
+    before = copy(trans_to_edit)
     while True: 
         try: 
             if attrib == "day":
@@ -158,7 +164,10 @@ def _new_input(ts: [Transaction], trans_index: int, attrib: str, ats: [Account])
                     for a in ats: 
                         if ts[trans_index] in a: 
                             a.remove(ts[trans_index])
+                    changes.mark_removed(trans_to_edit)
                     ts.remove(ts[trans_index])
+                    if jn is not None:
+                        jn.append(Delete(before))
                     print("Transaction Successfully Deleted")
                     break
                 else:
@@ -167,6 +176,8 @@ def _new_input(ts: [Transaction], trans_index: int, attrib: str, ats: [Account])
             print("    An error has occurred: " + str(e))
         else: 
             print("Transaction Successfully Updated")
+    if jn is not None and trans_to_edit != before:
+        jn.append(Edit(before, trans_to_edit))
         
         
 if __name__ == "__main__":
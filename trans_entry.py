@@ -6,6 +6,7 @@ import basecui as bc
 import trans_edit
 from trans_view import view, header 
 import valid
+import changes
 
 _menu = """ 
 TRANSACTION MENU:
@@ -57,6 +58,7 @@ def _enter(y=-1, m=-1) -> Transaction:
     c = _prompt_currency()
     
     t = Transaction(y,m,d,dr,cr,e,a) if c == "" else Transaction(y,m,d,dr,cr,e,a,c)
+    changes.mark(t)
     print("\nEntered Transaction:\n" + header())
     print(view(t))
     
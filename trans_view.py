@@ -1,6 +1,9 @@
 # trans_view.py 
 # Module to view attributes of Transactions, stylized.
 
+from time_index import TimeIndex
+from text_index import TextIndex
+import pager
 import basecui as bc 
 
 menu = """ 
@@ -10,26 +13,36 @@ VIEW MENU
     [mth]    : View transactions made within a month
     [ymo]    : View transactions made within a year and month
     [cst]    : View transactions made within a custom time frame 
+    [fnd]    : Find transactions by words of description or account names
     [esc]    : Return to previous menu
 """
 
-def main(ts: ["Transaction"]) -> None:
-    """Requests user prompt to display information about Transactions
+def main(ts: ["Transaction"], store=None, index: TimeIndex = None, 
+         text: TextIndex = None) -> None:
+    """Requests user prompt to display information about Transactions. 
+    Filters are run as queries against the SQLiteStore store if given, and 
+    otherwise against index, a TimeIndex over ts kept between visits. 
+    Searches are run against text, a TextIndex over ts kept likewise
     """
-    ts.sort(key=lambda x: (x.get_year(), x.get_month(), x.get_day()))
+    if index is None: 
+        index = TimeIndex(ts)
+    if text is None: 
+        text = TextIndex(ts)
     viewing = True 
     while viewing: 
         print(menu)
         try: 
             choice = input("Your choice: ").rstrip()
             if choice == "yrr": 
-                _by_year(ts) 
+                _by_year(index) 
             elif choice == "mth": 
-                _by_month(ts) 
+                _by_month(index) 
             elif choice == "ymo": 
-                _by_pair(ts) 
+                _by_pair(index, store) 
             elif choice == "cst":
-                _by_custom(ts) 
+                _by_custom(index) 
+            elif choice == "fnd":
+                _by_words(text) 
             elif choice == "esc": 
                 break 
             else: 
@@ -40,81 +53,92 @@ def main(ts: ["Transaction"]) -> None:
         viewing = bc.binary_question("View more transactions? ([y]es or [n]o): ", "y", "n")
 
 
-def _by_year(ts) -> None:
+def _by_year(index: TimeIndex) -> None:
     """Prints transactions in a year based on user input 
     """
     print()
-    y = bc.trans_timeframe(sorted(set(t.get_year() for t in ts)) + [-1])
+    y = bc.trans_timeframe(index.years() + [-1])
     if y == -1:  
         return
-    print("\n"+header()) 
-    for t in (i for i in ts if i.get_year() == y): 
-        print(view(t))
+    print()
+    pager.show(header(), (view(t) for t in index.year(y)))
         
 
-def _by_month(ts) -> None:
+def _by_month(index: TimeIndex) -> None:
     """Prints transactions in a month based on user input 
     """
-    s = (bc.months_abv(m) for m in sorted(set(t.get_month() for t in ts)))
+    s = (bc.months_abv(m) for m in index.months())
     print()
     m = bc.trans_timeframe(list(s) + [-1])
     if m == -1: 
         return 
-    print("\n"+header())
-    for t in (i for i in ts if i.get_month() == bc.months_to_int[m]): 
-        print(view(t)) 
+    print()
+    pager.show(header(), (view(t) for t in index.month(bc.months_to_int[m])))
 
 
-def _by_pair(ts) -> None:
+def _by_pair(index: TimeIndex, store=None) -> None:
     """Prints transactions in a month and year based on user input
     """
     print()
-    y = bc.trans_timeframe(sorted(set(t.get_year() for t in ts)) + [-1])
+    y = bc.trans_timeframe(index.years() + [-1])
     if y == -1: 
         return 
     
-    s = (bc.months_abv(m) for m in sorted(set(t.get_month() for t in ts)))
+    s = (bc.months_abv(m) for m in index.months())
     print()
     m = bc.trans_timeframe(list(s) + [-1])
     if m == -1: 
         return 
     
-    print("\n"+header())
-    for t in (i for i in ts if i.get_month() == bc.months_to_int[m] and \
-               i.get_year() == y): 
-        print(view(t))
+    print()
+    if store is not None: 
+        selected = store.by_pair(y, bc.months_to_int[m])
+    else: 
+        selected = index.pair(y, bc.months_to_int[m])
+    pager.show(header(), (view(t) for t in selected))
 
 
-def _by_custom(ts) -> None:
+def _by_custom(index: TimeIndex) -> None:
     """Prints transactions in a series of months and years based on user input
     """
-    def cond(y0,y1,m0,m1,t): return m0 <= t.get_month() <= m1 and y0 <= t.get_year() <= y1
     print()
-    y0 = bc.trans_timeframe(sorted(set(t.get_year() for t in ts)) + [-1])
-    if 0 == y0: 
+    y0 = bc.trans_timeframe(index.years() + [-1])
+    if -1 == y0: 
         return
-    s = (bc.months_abv(m) for m in sorted(set(t.get_month() for t in ts)))
+    s = (bc.months_abv(m) for m in index.months())
     print()
     m0 = bc.trans_timeframe(list(s) + [-1])
-    if 0 == m0: 
+    if -1 == m0: 
         return
     
     print()
-    y1 = bc.trans_timeframe(sorted(set(t.get_year() for t in ts)) + [-1])
-    if 0 == y1: 
+    y1 = bc.trans_timeframe(index.years() + [-1])
+    if -1 == y1: 
         return
-    s = (bc.months_abv(m) for m in sorted(set(t.get_month() for t in ts)))
+    s = (bc.months_abv(m) for m in index.months())
     print()
     m1 = bc.trans_timeframe(list(s) + [-1])
-    if 0 == m1: 
+    if -1 == m1: 
         return 
     
-    print("\n"+header())
-    for t in (i for i in ts if cond(
-        y0,y1,bc.months_to_int[m0],bc.months_to_int[m1],i)): 
-        print(view(t))    
+    print()
+    pager.show(header(), (view(t) for t in index.custom(
+        y0, bc.months_to_int[m0], y1, bc.months_to_int[m1])))
     
 
+def _by_words(text: TextIndex) -> None:
+    """Prints transactions having every word entered, or a word starting 
+    with it, in their description or account names
+    """
+    query = input("\nFind (e.g. wendy's cash): ").rstrip()
+    found = text.find(query)
+    if len(found) == 0: 
+        print("No transactions found for \"{}\"".format(query))
+        return 
+    print("{} transactions found\n".format(len(found)))
+    pager.show(header(), (view(t) for t in found))
+
+
 def header(show_num=False) -> str:
     """Returns header string
     """ 
@@ -3,76 +3,143 @@
 
 std_curr = "$"
 import valid
+import changes
+from sys import intern
+
+
+def pack_date(y: int, m: int, d: int) -> int:
+    """Returns a single integer for a zero based year, month and day. Packed 
+    dates order the same way as (year, month, day) tuples
+    """
+    assert -1 <= y <= 9999 and -1 <= m <= 11 and -1 <= d <= 30, \
+        "transaction.pack_date: {} {} {} not a valid date".format(y, m, d)
+    return ((y+1) << 9) | ((m+1) << 5) | (d+1)
+
+
+def unpack_date(o: int) -> (int, int, int):
+    """Returns 3-tuple of zero based year, month and day of a packed date
+    """
+    return (o >> 9) - 1, ((o >> 5) & 15) - 1, (o & 31) - 1
+
+
+def _intern(s):
+    """Returns the shared copy of a string, so that account names, descriptions
+    and currencies repeated across Transactions are stored once
+    """
+    return intern(s) if type(s) == str else s
+
 
 class Transaction:
+    __slots__ = ("_date", "_dr_account", "_cr_account", "_description", "_currency", 
+                 "_amount", "_gen", "_id")
+    
     def __init__(self, year, month, day, dr_acct, cr_acct, description, amount, currency=std_curr):
         """Initializes Transaction.  
         """
-        self._year          = year
-        self._month         = month
-        self._day           = day 
-        self._dr_account    = dr_acct 
-        self._cr_account    = cr_acct
-        self._description   = description
-        self._currency      = currency
+        self._date          = pack_date(year, month, day)
+        self._dr_account    = _intern(dr_acct)
+        self._cr_account    = _intern(cr_acct)
+        self._description   = _intern(description)
+        self._currency      = _intern(currency)
         self._amount        = amount    
+        self._gen           = 0         # Incremented by every setter
+        self._id            = None      # Unique ID assigned by a storage backend
 
 
     def __repr__(self):
+        y, m, d = unpack_date(self._date)
         return 'Transaction({}, {}, {}, "{}", "{}", "{}", {}, {})'.format(
-            self._year, self._month, self._day, self._dr_account, self._cr_account, self._description, 
+            y, m, d, self._dr_account, self._cr_account, self._description, 
             self._amount, repr(self._currency))
         
     
     def __eq__(self, right):
         assert type(right) == Transaction, \
         "transaction.Transaction.__eq__: Right operand is of type {} not Transaction".format(type(right))
-        return repr(self) == repr(right)
+        return self.key() == right.key()
+    
+    
+    def __hash__(self):
+        """Hash of the attribute values. A Transaction must not be mutated while 
+        it is held in a set or used as a dict key
+        """
+        return hash(self.key())
+    
+    
+    def key(self) -> tuple:
+        """Returns tuple of the attribute values that identify a Transaction
+        """
+        return (self._date, self._dr_account, self._cr_account, self._description, 
+                self._amount, self._currency)
     
     
     # Setters    
     def set_year(self, new_year: int) -> None:
         valid.year(new_year)
-        self._year = new_year 
+        _, m, d = unpack_date(self._date)
+        self._date = pack_date(new_year, m, d)
+        self._touch()
         
     def set_month(self, new_month: int):
         valid.month(new_month)
-        self._month = new_month 
+        y, _, d = unpack_date(self._date)
+        self._date = pack_date(y, new_month, d)
+        self._touch()
 
     def set_day(self, new_day: int):
-        valid.day(self._year, self._month, new_day)
-        self._day = new_day 
+        y, m, _ = unpack_date(self._date)
+        valid.day(y, m, new_day)
+        self._date = pack_date(y, m, new_day)
+        self._touch()
 
     def set_dr_account(self, account_name: str):
         valid.dr_account(account_name)
-        self._dr_account = account_name
+        self._dr_account = _intern(account_name)
+        self._touch()
         
     def set_cr_account(self, account_name: str):
         valid.cr_account(account_name)
-        self._cr_account = account_name
+        self._cr_account = _intern(account_name)
+        self._touch()
 
     def set_description(self, new_desc: str):
         valid.description(new_desc)
-        self._description = new_desc 
+        self._description = _intern(new_desc)
+        self._touch()
 
     def set_currency(self, new_currency: str): 
         valid.currency(new_currency)
-        self._currency = new_currency
+        self._currency = _intern(new_currency)
+        self._touch()
         
     def set_amount(self, new_amount): 
         valid.amount(new_amount)
         self._amount = new_amount
+        self._touch()
+        
+    def set_id(self, new_id: int):
+        self._id = new_id
+    
+    
+    def _touch(self) -> None:
+        """Records that the Transaction was mutated
+        """
+        self._gen += 1
+        changes.mark(self)
     
     
     # Getters 
-    def get_year(self):         return self._year
-    def get_month(self):        return self._month 
-    def get_day(self):          return self._day 
+    def get_year(self):         return (self._date >> 9) - 1
+    def get_month(self):        return ((self._date >> 5) & 15) - 1
+    def get_day(self):          return (self._date & 31) - 1
+    def get_date(self):         return self._date 
     def get_dr_account(self):   return self._dr_account 
     def get_cr_account(self):   return self._cr_account 
     def get_description(self):  return self._description 
     def get_currency(self):     return self._currency 
     def get_amount(self):       return self._amount 
+    def get_gen(self):          return self._gen 
+    def get_id(self):           return self._id 
 
 
     def flow(self, a):
@@ -105,4 +172,69 @@ if __name__ == "__main__":
     print()
     # Checking equality
     print(t1 == t2)
-    
\ No newline at end of file
+    print(len({t1, t2, Transaction(2015, 11, 24, "Cash", "Fast Food", "McDonald's", 400)}))
+    
+    # Benchmark: removing duplicates from 100,000 Transactions
+    import time
+    from basecui import remove_duplicates
+    
+    def remove_duplicates_by_repr(ts):
+        """Previous implementation, comparing reprs against a list
+        """
+        iterated = list() 
+        unique_ts= list() 
+        for t in ts: 
+            if repr(t) not in iterated: 
+                unique_ts.append(t)
+                iterated.append(repr(t))
+        return unique_ts
+        
+    ts = [Transaction(2015, i % 12, i % 28, "Cash", "Fast Food", "Meal", i) for i in range(50000)] * 2
+    start = time.perf_counter()
+    unique = remove_duplicates(ts)
+    print("Hashed : {} unique of {} in {:.3f} s".format(len(unique), len(ts), time.perf_counter()-start))
+    
+    n = 5000                                                                    # Quadratic; extrapolated
+    start = time.perf_counter()
+    remove_duplicates_by_repr(ts[:n//2] + ts[50000:50000+n//2])
+    secs = (time.perf_counter()-start) * (len(ts)/n)**2
+    print("Repr   : {} of {} in an estimated {:.0f} s".format(len(unique), len(ts), secs))
+    
+    
+    # Benchmark: memory per Transaction of a synthetic ledger loaded from text
+    import sys, tracemalloc, ledger_parser
+    
+    class DictTransaction:
+        """Previous layout: a per-instance __dict__ and no shared strings
+        """
+        def __init__(self, year, month, day, dr_acct, cr_acct, description, amount, currency=std_curr):
+            self._year          = year
+            self._month         = month
+            self._day           = day 
+            self._dr_account    = dr_acct 
+            self._cr_account    = cr_acct
+            self._description   = description
+            self._currency      = currency
+            self._amount        = amount    
+            self._gen           = 0
+            self._id            = None
+    
+    def load(lines, cls) -> int:
+        """Returns bytes allocated to build one cls per line
+        """
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        rows = list()
+        for line in lines: 
+            y, m, d, dr, cr, e, a, c = ledger_parser._transaction.match(line).groups()
+            rows.append(cls(int(y), int(m), int(d), dr, cr, e, int(a), c))
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        return used
+        
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    lines = [repr(Transaction(2000 + i % 20, i % 12, i % 28, "Account {}".format(i % 50), "Cash", 
+                              "Description {}".format(i % 1000), i % 100000)) for i in range(n)]
+    print("{:,} Transactions".format(n))
+    print("Before : {:.1f} bytes per Transaction".format(load(lines, DictTransaction)/n))
+    print("After  : {:.1f} bytes per Transaction".format(load(lines, Transaction)/n))
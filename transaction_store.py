@@ -0,0 +1,233 @@
+# transaction_store.py
+# Columnar storage of Transactions for bulk analysis
+
+from transaction import Transaction, unpack_date
+from array       import array
+
+try:                                                # NumPy is optional; the array
+    import numpy as np                              # module is used without it
+except ImportError:
+    np = None
+
+
+class TransactionView:
+    """Read-only Transaction backed by one row of a TransactionStore
+    """
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "TransactionStore", i: int):
+        self._store = store
+        self._i     = i
+
+    def __repr__(self):
+        return 'Transaction({}, {}, {}, "{}", "{}", "{}", {}, {})'.format(
+            self.get_year(), self.get_month(), self.get_day(), self.get_dr_account(),
+            self.get_cr_account(), self.get_description(), self.get_amount(),
+            repr(self.get_currency()))
+
+    def get_year(self):         return self._store._year[self._i]
+    def get_month(self):        return self._store._month[self._i]
+    def get_day(self):          return self._store._day[self._i]
+    def get_dr_account(self):   return self._store._names[self._store._dr[self._i]]
+    def get_cr_account(self):   return self._store._names[self._store._cr[self._i]]
+    def get_description(self):  return self._store._descriptions[self._i]
+    def get_currency(self):     return self._store._currencies[self._i]
+    def get_amount(self):       return self._store._amount[self._i]
+
+    def flow(self, a):
+        return 1 if self.get_dr_account() == a else -1
+
+
+class TransactionStore:
+    def __init__(self, ts: [Transaction] = ()):
+        self._year          = array("h")
+        self._month         = array("b")
+        self._day           = array("b")
+        self._amount        = array("q")
+        self._dr            = array("i")        # Account name IDs
+        self._cr            = array("i")
+        self._descriptions  = list()
+        self._currencies    = list()
+        self._names         = list()            # Account name ID -> name
+        self._name_ids      = dict()            # name -> Account name ID
+        self._rows          = dict()            # id() of Transaction -> (Transaction, generation, row); holding
+                                                # the Transaction keeps its id() from being reused
+        self._account_rows  = dict()            # id() of Account -> (Account, generation, rows)
+        for t in ts:
+            self.append(t)
+
+
+    def __len__(self):
+        return len(self._amount)
+
+
+    def __getitem__(self, i: int) -> TransactionView:
+        if not 0 <= i < len(self):
+            raise IndexError("transaction_store.TransactionStore: row {} out of range".format(i))
+        return TransactionView(self, i)
+
+
+    def _name_id(self, name: str) -> int:
+        if name not in self._name_ids:
+            self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return self._name_ids[name]
+
+
+    def append(self, t: Transaction) -> int:
+        """Appends a Transaction as a new row. Returns the row
+        """
+        y, m, d = unpack_date(t.get_date())
+        self._year.append(y); self._month.append(m); self._day.append(d)
+        self._amount.append(t.get_amount())
+        self._dr.append(self._name_id(t.get_dr_account()))
+        self._cr.append(self._name_id(t.get_cr_account()))
+        self._descriptions.append(t.get_description())
+        self._currencies.append(t.get_currency())
+        self._rows[id(t)] = (t, t.get_gen(), len(self._amount) - 1)
+        return len(self._amount) - 1
+
+
+    def _rewrite(self, t: Transaction, i: int) -> int:
+        """Writes the values of a Transaction edited since they were stored
+        over its row i. Returns the row
+        """
+        self._year[i], self._month[i], self._day[i] = unpack_date(t.get_date())
+        self._amount[i] = t.get_amount()
+        self._dr[i] = self._name_id(t.get_dr_account())
+        self._cr[i] = self._name_id(t.get_cr_account())
+        self._descriptions[i] = t.get_description()
+        self._currencies[i] = t.get_currency()
+        self._rows[id(t)] = (t, t.get_gen(), i)
+        return i
+
+
+    def row(self, t: Transaction) -> int:
+        """Returns row of a Transaction, appending it if the store does not
+        hold it yet, or rewriting it if it was edited since it was stored
+        """
+        stored = self._rows.get(id(t))
+        if stored is None:
+            return self.append(t)
+        if stored[1] != t.get_gen():
+            return self._rewrite(t, stored[2])
+        return stored[2]
+
+
+    def rows_of(self, a: "Account") -> array:
+        """Returns rows of an Account's Transactions, as row does. Kept until
+        the Account's generation changes, which editing one of its 
+        Transactions also changes
+        """
+        cached = self._account_rows.get(id(a))
+        if cached is None or cached[1] != a.get_gen():
+            rows = array("i", (self.row(t) for t in a.get_ts()))
+            cached = self._account_rows[id(a)] = (a, a.get_gen(), rows)
+        return cached[2]
+
+
+    def _months(self, rows) -> "sequence":
+        """Returns month index (year * 12 + month) of each row
+        """
+        if np is not None:
+            return self._column(self._year)[rows] * 12 + self._column(self._month)[rows]
+        return [self._year[i]*12 + self._month[i] for i in rows]
+
+
+    @staticmethod
+    def _column(a: array) -> "numpy.ndarray":
+        return np.frombuffer(a, dtype=a.typecode).astype(np.int64)
+
+
+    def range_total(self, rows, start: (int, int), end: (int, int)) -> int:
+        """Returns sum of the amounts of rows from month start to month end
+        inclusive
+        """
+        lo, hi = start[0]*12 + start[1], end[0]*12 + end[1]
+        if np is not None:
+            rows = np.frombuffer(rows, dtype=np.int32)
+            months = self._months(rows)
+            return int(self._column(self._amount)[rows][(months >= lo) & (months <= hi)].sum())
+        return sum(self._amount[i] for i, k in zip(rows, self._months(rows)) if lo <= k <= hi)
+
+
+    def monthly_totals(self, ats: ["Account"], signed=True) -> {str: {(int, int): int}}:
+        """Returns dictionary of Account name to its monthly totals, computed
+        for all Accounts in one grouped pass. Signed totals follow
+        Transaction.flow, so they match the Budgets an Account starts with
+        """
+        result = {a.get_name(): dict() for a in ats}
+        if np is not None:
+            rows    = [np.frombuffer(self.rows_of(a), dtype=np.int32) for a in ats]
+            if sum(len(r) for r in rows) == 0:
+                return result
+            groups  = np.concatenate([np.full(len(r), g, dtype=np.int64) for g, r in enumerate(rows)])
+            names   = np.array([self._name_id(a.get_name()) for a in ats], dtype=np.int64)
+            rows    = np.concatenate(rows)
+            months  = self._months(rows)
+            base    = int(months.min())
+            width   = int(months.max()) - base + 1
+            keys    = groups * width + (months - base)
+            weights = self._column(self._amount)[rows]
+            if signed:
+                weights = np.where(self._column(self._dr)[rows] == names[groups], weights, -weights)
+            totals  = np.bincount(keys, weights=weights, minlength=len(ats)*width)
+            present = np.bincount(keys, minlength=len(ats)*width)
+            for k in np.nonzero(present)[0]:
+                g, month = divmod(int(k), width)
+                result[ats[g].get_name()][divmod(base + month, 12)] = int(totals[k])
+            return result
+
+        year, month, amount, dr = self._year, self._month, self._amount, self._dr
+        for a in ats:
+            d = result[a.get_name()]
+            name_id = self._name_id(a.get_name())
+            for i in self.rows_of(a):
+                k = (year[i], month[i])
+                d[k] = d.get(k, 0) + (amount[i] if dr[i] == name_id or not signed else -amount[i])
+        return result
+
+
+# Testing
+if __name__ == "__main__":
+    import time, account_init
+
+    t0 = Transaction(2015, 11, 24, "Fast Food", "Cash", "McDonald's", 300)
+    t1 = Transaction(2015, 10, 24, "Fast Food", "Cash", "Wendy's", 500)
+    t2 = Transaction(2015, 10, 22, "Drinks", "Savings", "Coffee", 200)
+    ats = account_init.create_from([t0, t1, t2])
+    store = TransactionStore([t0, t1, t2])
+    print(store[1], store[1].get_year())
+    print(store.monthly_totals(ats))
+    print(store.range_total(store.rows_of(ats[0]), (2015, 0), (2015, 10)))
+    t1.set_month(9)
+    ats[0].update_all_reached()
+    print(store.monthly_totals(ats)["Fast Food"], store[1])
+
+    # Benchmark: monthly totals of every Account
+    n = 200000
+    ts = [Transaction(2000 + i % 20, i % 12, i % 28, "Account {}".format(i % 50), "Cash",
+                      "Description", i % 1000) for i in range(n)]
+    ats = account_init.create_from(ts)
+    store = TransactionStore(ts)
+
+    def sum_by_getters(a) -> {int: {int: int}}:
+        """Monthly totals of an Account, calling getters on every Transaction
+        """
+        d = dict()
+        for t in a.get_ts():
+            m = d.setdefault(t.get_year(), dict())
+            m[t.get_month()] = m.get(t.get_month(), 0) + t.get_amount()*t.flow(a.get_name())
+        return d
+
+    start = time.perf_counter()
+    by_getters = {a.get_name(): sum_by_getters(a) for a in ats}
+    print("Getters  : {:.3f} s".format(time.perf_counter()-start))
+
+    for run in ("first", "cached rows"):
+        start = time.perf_counter()
+        grouped = store.monthly_totals(ats)
+        print("Columnar : {:.3f} s, {} ({})".format(
+            time.perf_counter()-start, run, "NumPy" if np is not None else "array"))
+    assert all(by_getters[a][y][m] == grouped[a][(y, m)]
+               for a in by_getters for y in by_getters[a] for m in by_getters[a][y])